@@ -1,42 +1,157 @@
+import io
 import json
 import os
 
 import allure
 import httpx
-from httpx import Client, Response, QueryParams
-from pydantic_core import Url
-from typing import Union, Optional, Dict, List, Any
+from httpx import Client, Response, QueryParams, URL
+from pydantic_core import Url, from_json
+from typing import Union, Optional, Dict, List, Any, Iterable, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from tools.logger import get_logger
-from tools.attachments import attach_request_to_allure, attach_response_to_allure
+from tools.attachments import attach_request_to_allure, attach_response_to_allure, is_allure_enabled, is_allure_verbose
+from tools.headers import CanonicalHeaders, FrozenCanonicalHeaders
 import xml.etree.ElementTree as ET
+from lxml import etree
 
 logger = get_logger(__name__)
 
+_MISSING = object()
+
+# Токен X-Challenger из окружения: читается один раз и обновляется через refresh_challenger_token
+_challenger_token: Optional[str] = None
+
+
+def refresh_challenger_token() -> str:
+    """
+    Перечитывает токен X-Challenger из переменной окружения API_X_CHALLENGER.
+
+    Вызывается после изменения os.environ (например, в ChallengesClient.generate_new_challenger).
+
+    :return: Актуальный токен (пустая строка, если переменная не задана)
+    """
+    global _challenger_token
+    _challenger_token = os.environ.get("API_X_CHALLENGER", "")
+    logger.debug("X-Challenger token refreshed from environment")
+    return _challenger_token
+
+
+def get_challenger_token() -> str:
+    """
+    Возвращает закэшированный токен X-Challenger, при первом обращении читает его из окружения.
+
+    :return: Токен X-Challenger (пустая строка, если переменная не задана)
+    """
+    if _challenger_token is None:
+        return refresh_challenger_token()
+    return _challenger_token
+
+
+def _extract_ids(json_data: Any) -> List[Any]:
+    """
+    Извлекает все значения ключа 'id' из JSON-структуры в порядке их следования в документе.
+
+    Обход итеративный (явный стек) вместо рекурсии: без накладных расходов на вызовы функций
+    и без ограничения глубины рекурсии.
+
+    :param json_data: Разобранный JSON (dict, list и т.д.)
+    :return: Список найденных значений 'id'
+    """
+    ids: List[Any] = []
+    stack = [json_data]
+    while stack:
+        node = stack.pop()
+        # response.json() возвращает обычные dict/list, поэтому достаточно точной проверки типа
+        if type(node) is dict:
+            value = node.get("id", _MISSING)
+            if value is not _MISSING:
+                ids.append(value)
+            stack.extend(reversed(node.values()))
+        elif type(node) is list:
+            stack.extend(reversed(node))
+    return ids
+
+
+# XML-тела, уже прошедшие проверку (упорядоченный dict как FIFO-множество ограниченного размера).
+# Хранятся сами строки: совпадение только по хэшу пропустило бы некорректный XML при коллизии.
+# Запоминаются только тела до 64 КиБ, чтобы крупные тела не удерживались в памяти до конца сессии
+_XML_VALIDATED: Dict[str, None] = {}
+_XML_VALIDATED_MAXSIZE = 1024
+_XML_VALIDATED_MAX_BODY_LEN = 64 * 1024
+
+
+def _validate_xml(data: str) -> None:
+    """
+    Проверяет, что строка является корректным XML.
+
+    Успешно проверенные тела (до _XML_VALIDATED_MAX_BODY_LEN символов) запоминаются, поэтому повторяющиеся
+    тела запросов (фикстуры, параметризация) разбираются только один раз. Ошибки не запоминаются.
+
+    :param data: XML-строка
+    :raises ET.ParseError: Если строка не является корректным XML
+    """
+    if data in _XML_VALIDATED:
+        return
+    ET.fromstring(data)
+    if len(data) > _XML_VALIDATED_MAX_BODY_LEN:
+        return
+    _XML_VALIDATED[data] = None
+    if len(_XML_VALIDATED) > _XML_VALIDATED_MAXSIZE:
+        # Вытеснение самой старой записи
+        del _XML_VALIDATED[next(iter(_XML_VALIDATED))]
+
+
 class BaseClient:
     """
     Базовый клиент для выполнения HTTP-запросов с логированием и Allure-отчетами.
 
     Предоставляет методы для отправки запросов и обработки ответов.
     """
+    # Фиксированный набор атрибутов: доступ через слоты вместо __dict__ экземпляра
+    __slots__ = ("client", "_endpoint", "_default_headers_lower", "_default_headers_source",
+                 "_default_request_headers")
+
     def __init__(self, client: Client):
         self._endpoint = None
         self.client = client
+        self.refresh_headers()
         logger.info("BaseClient initialized with provided HTTP client")
 
-    def _request(self, method: str, url: Union[Url, str], **kwargs) -> Response:
+    def refresh_headers(self) -> None:
         """
-        Внутренний метод для выполнения HTTP-запроса с логированием и Allure-отчетами.
+        Пересобирает кэш заголовков клиента по умолчанию (ключи в нижнем регистре).
 
-        :param method: HTTP-метод (GET, POST, HEAD и т.д.)
-        :param url: URL для запроса (строка или объект Url)
-        :param kwargs: Дополнительные параметры запроса (заголовки, параметры и т.д.)
-        :return: Объект Response с результатом запроса
+        Вызывается при инициализации и автоматически, если заголовки клиента были заменены или изменился их набор.
+        """
+        headers = self.client.headers
+        self._default_headers_lower = CanonicalHeaders(headers.items())
+        self._default_headers_source = (id(headers), len(headers))
+        # Готовые заголовки для запросов без переопределений: (токен X-Challenger, заголовки)
+        self._default_request_headers: Optional[Tuple[str, FrozenCanonicalHeaders]] = None
+        logger.debug("Default client headers cached")
+
+    def _build_headers(self, headers: Optional[CanonicalHeaders]) -> CanonicalHeaders:
+        """
+        Формирует итоговые заголовки запроса: заголовки клиента, токен X-Challenger и переданные значения.
+
+        :param headers: Дополнительные заголовки, уже нормализованные в get/post/head
+        :return: CanonicalHeaders с ключами в нижнем регистре (без переопределений - общий FrozenCanonicalHeaders,
+            доступный только для чтения)
         """
-        # Получение токена X-Challenger из переменных окружения
-        current_x_challenger = os.environ.get("API_X_CHALLENGER", "")
-        headers: Optional[Dict[str, str]] = kwargs.pop("headers", None)
-        # Нормализация заголовков клиента (приведение ключей к нижнему регистру)
-        request_headers = {k.lower(): v for k, v in self.client.headers.items()}
+        # Получение токена X-Challenger (кэш значения из переменных окружения)
+        current_x_challenger = get_challenger_token()
+        # Заголовки клиента нормализуются один раз, здесь берется копия кэша
+        client_headers = self.client.headers
+        if self._default_headers_source != (id(client_headers), len(client_headers)):
+            self.refresh_headers()
+
+        # Без переопределений используется общий готовый словарь (только для чтения), пока не сменился токен
+        if not headers:
+            cached = self._default_request_headers
+            if cached is not None and cached[0] == current_x_challenger:
+                return cached[1]
+
+        request_headers = self._default_headers_lower.copy()
 
         # Добавление или удаление токена X-Challenger в заголовках
         if current_x_challenger:
@@ -44,55 +159,135 @@ class BaseClient:
         elif "x-challenger" in request_headers: # Если токен стал пустой, удаляем старый
              del request_headers["x-challenger"]
 
-        # Обновление заголовков переданными значениями, если они есть
-        if headers is not None:
-            request_headers.update({k.lower(): v for k, v in headers.items()})
-            logger.debug(f"Headers updated with custom values: {headers}")
+        if not headers:
+            # Общий для всех запросов словарь неизменяем: случайное изменение не затронет следующие запросы
+            request_headers = FrozenCanonicalHeaders(request_headers)
+            self._default_request_headers = (current_x_challenger, request_headers)
+            return request_headers
+
+        # Обновление заголовков переданными значениями
+        request_headers.update(headers)
+        logger.debug("Headers updated with custom values: %s", headers)
+        return request_headers
+
+    def _request(self, method: str, url: Union[URL, Url, str], **kwargs) -> Response:
+        """
+        Внутренний метод для выполнения HTTP-запроса с логированием и Allure-отчетами.
+
+        :param method: HTTP-метод (GET, POST, HEAD и т.д.)
+        :param url: URL для запроса (строка, httpx.URL или объект Url)
+        :param kwargs: Дополнительные параметры запроса (заголовки, параметры и т.д.)
+        :return: Объект Response с результатом запроса
+        """
+        request_headers = self._build_headers(kwargs.pop("headers", None))
+        # Вложения формируются только если Allure их действительно принимает
+        allure_enabled = is_allure_enabled()
 
-        logger.info(f"Make {method} request to {url} with headers {request_headers} params {kwargs.get('params', {})}")
-        attach_request_to_allure(method=method, url=str(url), headers=request_headers, **kwargs)
+        logger.info("Make %s request to %s with headers %s params %s",
+                    method, url, request_headers, kwargs.get("params", {}))
+        if allure_enabled:
+            attach_request_to_allure(method=method, url=str(url), headers=request_headers, **kwargs)
 
         # Выполнение HTTP-запроса
         response = self.client.request(method, url, headers=request_headers, **kwargs)
 
-        logger.info(f"Received response with status {response.status_code} from {url}")
-        attach_response_to_allure(response, method=method, url=str(url))
+        logger.info("Received response with status %s from %s", response.status_code, url)
+        if allure_enabled:
+            attach_response_to_allure(response, method=method, url=str(url))
         return response
 
-    def get(self, url: Union[Url, str], params: QueryParams | None = None, headers: Dict[str, str] | None = None) -> Response:
+    def _request_many(self, method: str, calls: Sequence[Tuple[Union[URL, Url, str], Dict[str, Any]]],
+                      max_workers: int = 8) -> List[Response]:
+        """
+        Выполняет несколько HTTP-запросов параллельно через общий пул соединений клиента.
+
+        Сетевые вызовы идут в пуле потоков, а логирование и Allure-вложения выполняются
+        в вызывающем потоке, чтобы не нарушать порядок шагов в отчете.
+
+        :param method: HTTP-метод (GET, POST, HEAD и т.д.)
+        :param calls: Последовательность пар (URL, параметры запроса); заголовки уже нормализованы
+        :param max_workers: Максимальное число одновременных запросов
+        :return: Список Response в порядке переданных запросов
+        """
+        if not calls:
+            return []
+
+        prepared = []
+        for url, kwargs in calls:
+            kwargs = dict(kwargs)
+            request_headers = self._build_headers(kwargs.pop("headers", None))
+            logger.info("Make %s request to %s with headers %s params %s",
+                        method, url, request_headers, kwargs.get("params", {}))
+            prepared.append((url, request_headers, kwargs))
+
+        def send(call: Tuple[Union[URL, Url, str], Dict[str, str], Dict[str, Any]]) -> Response:
+            url, request_headers, kwargs = call
+            return self.client.request(method, url, headers=request_headers, **kwargs)
+
+        # Выполнение HTTP-запросов: httpx.Client потокобезопасен и делит пул keep-alive соединений
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(prepared))) as executor:
+            responses = list(executor.map(send, prepared))
+
+        allure_enabled = is_allure_enabled()
+        for (url, request_headers, kwargs), response in zip(prepared, responses):
+            logger.info("Received response with status %s from %s", response.status_code, url)
+            if allure_enabled:
+                attach_request_to_allure(method=method, url=str(url), headers=request_headers, **kwargs)
+                attach_response_to_allure(response, method=method, url=str(url))
+        return responses
+
+    def get(self, url: Union[URL, Url, str], params: QueryParams | None = None, headers: Dict[str, str] | None = None) -> Response:
         """
         Выполняет GET-запрос к указанному URL.
 
-        :param url: URL для запроса (строка или объект Url)
+        :param url: URL для запроса (строка, httpx.URL или объект Url)
         :param params: Параметры запроса (опционально)
         :param headers: Дополнительные HTTP-заголовки (опционально)
         :return: Объект Response с результатом запроса
         """
-        logger.debug(f"Preparing GET request to {url} with params {params}")
-        return self._request("GET", url, params=params, headers=headers)
+        logger.debug("Preparing GET request to %s with params %s", url, params)
+        return self._request("GET", url, params=params, headers=CanonicalHeaders.of(headers))
+
+    def get_many(self, urls: Iterable[Union[URL, Url, str]], params: QueryParams | None = None,
+                 headers: Dict[str, str] | None = None, max_workers: int = 8) -> List[Response]:
+        """
+        Выполняет несколько GET-запросов параллельно.
+
+        :param urls: URL для запросов (строки, httpx.URL или объекты Url)
+        :param params: Параметры запроса, общие для всех URL (опционально)
+        :param headers: Дополнительные HTTP-заголовки, общие для всех URL (опционально)
+        :param max_workers: Максимальное число одновременных запросов
+        :return: Список Response в порядке переданных URL
+        """
+        headers = CanonicalHeaders.of(headers)
+        calls = [(url, {"params": params, "headers": headers}) for url in urls]
+        logger.debug("Preparing %s concurrent GET requests with params %s", len(calls), params)
+        return self._request_many("GET", calls, max_workers=max_workers)
 
-    def post(self, url: Union[Url, str], data: Optional[Any] = None,
+    def post(self, url: Union[URL, Url, str], data: Optional[Any] = None,
              headers: Optional[Dict[str, str]] = None) -> Response:
         """
         Выполняет POST-запрос к указанному URL с поддержкой JSON или XML в теле.
 
-        :param url: URL для запроса (строка или объект Url)
+        :param url: URL для запроса (строка, httpx.URL или объект Url)
         :param data: Данные для тела запроса (словарь для JSON или строка для XML, опционально)
         :param headers: Дополнительные HTTP-заголовки (опционально). Content-Type определяет тип данных
         :return: Объект Response с результатом запроса
         :raises ValueError: Если Content-Type не указан или не поддерживается для переданных данных
         """
         # Логирование подготовки POST-запроса
-        logger.info(f"Preparing POST request to {url}")
+        logger.info("Preparing POST request to %s", url)
 
         # Инициализация словаря для аргументов запроса и заголовков
         request_kwargs = {}
-        headers = headers or {}
+        headers = CanonicalHeaders(headers)
 
         # Проверка наличия данных
         if data is not None:
-            # Определение Content-Type из заголовков (приведение к нижнему регистру для единообразия)
-            content_type = next((v.lower() for k, v in headers.items() if k.lower() == "content-type"), None)
+            # Определение Content-Type из заголовков: ключи уже в нижнем регистре, значение приводится для единообразия
+            content_type = headers.get("content-type")
+            if content_type is not None:
+                content_type = content_type.lower()
 
             # Обработка JSON-данных
             if content_type == "application/json" or (content_type is None and isinstance(data, (dict, list))):
@@ -101,28 +296,28 @@ class BaseClient:
                     json.dumps(data)
                     request_kwargs["json"] = data
                     headers["Content-Type"] = "application/json"
-                    logger.debug(f"Adding JSON data to request body: {data}")
+                    logger.debug("Adding JSON data to request body: %s", data)
                 except (TypeError, ValueError) as e:
-                    logger.error(f"Invalid JSON data provided: {e}")
+                    logger.error("Invalid JSON data provided: %s", e)
                     raise ValueError(f"Data cannot be serialized as JSON: {e}")
 
             # Обработка XML-данных
             elif content_type == "application/xml" or (content_type is None and isinstance(data, str)):
                 try:
-                    # Проверяем, что строка является валидным XML
-                    ET.fromstring(data)
+                    # Проверяем, что строка является валидным XML (повторные тела берутся из кэша)
+                    _validate_xml(data)
                     request_kwargs["content"] = data.encode("utf-8")  # Передаем XML как байты
                     headers["Content-Type"] = "application/xml"
                     logger.debug(
-                        f"Adding XML data to request body: {data[:100]}...")  # Первые 100 символов для безопасности
+                        "Adding XML data to request body: %s...", data[:100])  # Первые 100 символов для безопасности
                 except ET.ParseError as e:
-                    logger.error(f"Invalid XML data provided: {e}")
+                    logger.error("Invalid XML data provided: %s", e)
                     raise ValueError(f"Data is not valid XML: {e}")
 
             # Обработка неподдерживаемого Content-Type или данных
             else:
                 logger.error(
-                    f"Unsupported or missing Content-Type for data. Content-Type: {content_type}, data type: {type(data)}")
+                    "Unsupported or missing Content-Type for data. Content-Type: %s, data type: %s", content_type, type(data))
                 raise ValueError(
                     f"Unsupported Content-Type '{content_type}' or data type {type(data)}. "
                     "Use 'application/json' for dict/list or 'application/xml' for string."
@@ -131,28 +326,24 @@ class BaseClient:
             logger.debug("No data provided for POST request body")
 
         # Логирование заголовков
-        logger.debug(f"Request headers: {headers}")
+        logger.debug("Request headers: %s", headers)
 
-        try:
-            # Выполнение POST-запроса через внутренний метод _request
-            response = self._request("POST", url, headers=headers, **request_kwargs)
-            logger.info(f"POST request completed with status code: {response.status_code}")
-            return response
-        except Exception as e:
-            logger.error(f"Failed to execute POST request to {url}: {e}")
-            raise
+        # Выполнение POST-запроса через внутренний метод _request
+        response = self._request("POST", url, headers=headers, **request_kwargs)
+        logger.info("POST request completed with status code: %s", response.status_code)
+        return response
 
-    def head(self, url: Union[Url, str], json: dict | None = None, headers: Dict[str, str] | None = None) -> Response:
+    def head(self, url: Union[URL, Url, str], json: dict | None = None, headers: Dict[str, str] | None = None) -> Response:
         """
         Выполняет HEAD-запрос к указанному URL.
 
-        :param url: URL для запроса (строка или объект Url)
+        :param url: URL для запроса (строка, httpx.URL или объект Url)
         :param json: JSON-данные для тела запроса (опционально)
         :param headers: Дополнительные HTTP-заголовки (опционально)
         :return: Объект Response с результатом запроса
         """
-        logger.debug(f"Preparing HEAD request to {url} with JSON data {json}")
-        return self._request("HEAD", url, json=json, headers=headers)
+        logger.debug("Preparing HEAD request to %s with JSON data %s", url, json)
+        return self._request("HEAD", url, json=json, headers=CanonicalHeaders.of(headers))
 
     @allure.step("Get available IDs")
     def get_available_ids(self, headers: Optional[Dict[str, str]] = None) -> List[Any]:
@@ -171,14 +362,14 @@ class BaseClient:
 
         # Формирование URL с удалением начального слэша
         endpoint = self._endpoint.lstrip('/')
-        logger.debug(f"Preparing to fetch IDs from endpoint: /{endpoint}")
+        logger.debug("Preparing to fetch IDs from endpoint: /%s", endpoint)
 
         # Выполнение GET-запроса
         try:
             response = self.get(f"/{endpoint}", headers=headers)
             response.raise_for_status()
         except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error: {e}")
+            logger.error("HTTP error: %s", e)
             raise
 
         # Определение типа содержимого ответа
@@ -188,55 +379,50 @@ class BaseClient:
         # Обработка JSON-ответа
         if "application/json" in content_type:
             try:
-                data = response.json()
+                # Разбор байтов ответа парсером pydantic-core (jiter) без промежуточного декодирования в str
+                data = from_json(response.content)
                 logger.debug("Parsing JSON response for IDs")
-
-                def extract_ids(json_data: Any, ids_list: List[Any]) -> None:
-                    if isinstance(json_data, dict):
-                        if "id" in json_data:
-                            ids_list.append(json_data["id"])
-                        for value in json_data.values():
-                            extract_ids(value, ids_list)
-                    elif isinstance(json_data, list):
-                        for item in json_data:
-                            extract_ids(item, ids_list)
-
-                extract_ids(data, ids)
+                ids = _extract_ids(data)
             except ValueError as e:
                 allure.attach(
                     response.text,
                     name="Invalid JSON",
                     attachment_type=allure.attachment_type.JSON
                 )
-                logger.error(f"JSON parsing error: {e}")
+                logger.error("JSON parsing error: %s", e)
                 raise ValueError(f"Response is not valid JSON: {e}")
         # Обработка XML-ответа
         elif "application/xml" in content_type:
             try:
-                root = ET.fromstring(response.text)
-                id_elements = root.findall(".//id")
-                ids = [elem.text or "" for elem in id_elements]
+                # Потоковый разбор байтов ответа в lxml: дерево целиком не строится,
+                # обработанные элементы <id> сразу очищаются. Корневой элемент не учитывается,
+                # как и в прежнем root.findall(".//id")
+                for _, elem in etree.iterparse(io.BytesIO(response.content), tag="id"):
+                    if elem.getparent() is not None:
+                        ids.append(elem.text or "")
+                    elem.clear()
                 logger.debug("Parsing XML response for IDs")
-            except ET.ParseError as e:
+            except etree.XMLSyntaxError as e:
                 # Прикрепление некорректного XML к Allure и логирование ошибки
                 allure.attach(
                     response.text,
                     name="Invalid XML",
                     attachment_type=allure.attachment_type.TEXT
                 )
-                logger.error(f"XML parsing error: {e}")
+                logger.error("XML parsing error: %s", e)
                 raise ValueError(f"Response is not valid XML: {e}")
         # Обработка неподдерживаемого типа содержимого
         else:
-            logger.error(f"Unsupported content type: {content_type}")
+            logger.error("Unsupported content type: %s", content_type)
             raise ValueError(f"Unsupported content type: {content_type}")
 
-        # Логирование и прикрепление извлеченных ID к Allure
-        logger.debug(f"Extracted IDs: {ids}")
-        allure.attach(
-            str(ids),
-            name="Extracted IDs",
-            attachment_type=allure.attachment_type.TEXT
-        )
-        logger.info(f"Successfully extracted {len(ids)} IDs from response")
+        # Логирование и прикрепление извлеченных ID к Allure (информационное вложение - только в подробном режиме)
+        logger.debug("Extracted IDs: %s", ids)
+        if is_allure_verbose():
+            allure.attach(
+                str(ids),
+                name="Extracted IDs",
+                attachment_type=allure.attachment_type.TEXT
+            )
+        logger.info("Successfully extracted %s IDs from response", len(ids))
         return ids
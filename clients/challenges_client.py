@@ -1,25 +1,31 @@
 import os
 from tools.logger import get_logger
 from dotenv import load_dotenv, set_key
-from clients.base_client import BaseClient
-from config.api_routes import APIRoutes
+from clients.base_client import BaseClient, refresh_challenger_token
+from tools.headers import CanonicalHeaders
+from config.api_routes import APIRoutes, ROUTE_URLS
 import allure
 from httpx import Response
-from typing import Optional
+from typing import List, Optional, Sequence
 
 logger = get_logger(__name__)
 
+# Путь к .env в корне проекта (нормализован для кросс-платформенности)
+ENV_FILE = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".env"))
+
 class ChallengesClient(BaseClient):
     """
     Клиент для работы с эндпоинтом /challenges API_CHALLENGES.
 
     Наследуется от BaseClient, предоставляет методы для взаимодействия с API заданий.
     """
+    __slots__ = ()
+
     def __init__(self, client):
         super().__init__(client)
         # Установка эндпоинта для работы с API заданиями
         self._endpoint = APIRoutes.CHALLENGES.value
-        logger.info("ChallengesClient initialized with endpoint: " + self._endpoint)
+        logger.info("ChallengesClient initialized with endpoint: %s", self._endpoint)
 
     @allure.step("Get all challenges")
     def get_challenges_api(self, headers: Optional[dict[str, str]] = None, params: Optional[dict[str, str]] = None) -> Response:
@@ -31,16 +37,29 @@ class ChallengesClient(BaseClient):
         :return: Объект Response с результатом запроса
         """
         logger.info("Fetching all challenges from API")
-        logger.debug(f"Request parameters - headers: {headers}, params: {params}")
-        try:
-            # Выполнение GET-запроса к эндпоинту заданий
-            response = self.get(APIRoutes.CHALLENGES.value, headers=headers, params=params)
-            logger.info(f"Successfully fetched challenges, status code: {response.status_code}")
-            return response
-        except Exception as e:
-            # Логирование ошибки при выполнении запроса
-            logger.error(f"Failed to fetch challenges: {e}")
-            raise
+        logger.debug("Request parameters - headers: %s, params: %s", headers, params)
+        # Выполнение GET-запроса к эндпоинту заданий
+        response = self.get(ROUTE_URLS[APIRoutes.CHALLENGES], headers=headers, params=params)
+        logger.info("Successfully fetched challenges, status code: %s", response.status_code)
+        return response
+
+    @allure.step("Get all challenges for several header sets")
+    def get_challenges_api_many(self, headers_list: Sequence[Optional[dict[str, str]]],
+                                params: Optional[dict[str, str]] = None, max_workers: int = 8) -> List[Response]:
+        """
+        Получает список всех заданий параллельно для нескольких наборов заголовков.
+
+        :param headers_list: Наборы дополнительных заголовков, по одному на запрос (None - заголовки по умолчанию)
+        :param params: Query-параметры, общие для всех запросов
+        :param max_workers: Максимальное число одновременных запросов
+        :return: Список Response в порядке переданных наборов заголовков
+        """
+        logger.info("Fetching all challenges for %s header sets", len(headers_list))
+        url = ROUTE_URLS[APIRoutes.CHALLENGES]
+        calls = [(url, {"params": params, "headers": CanonicalHeaders.of(headers)}) for headers in headers_list]
+        responses = self._request_many("GET", calls, max_workers=max_workers)
+        logger.info("Successfully fetched challenges for %s header sets", len(responses))
+        return responses
 
     @allure.step("Get new token")
     def generate_new_challenger(self) -> Response:
@@ -50,47 +69,45 @@ class ChallengesClient(BaseClient):
         :return: Возвращает ответ без тела, с заголовком X-CHALLENGER, содержащим токен
         """
         logger.info("Generating new challenger token")
-        try:
-            # Выполнение POST-запроса для получения нового токена
-            response = self.post(APIRoutes.NEW_TOKEN.value, headers={"X-CHALLENGER": ""})
-            logger.debug(f"Received response with status code: {response.status_code}")
+        # Выполнение POST-запроса для получения нового токена
+        response = self.post(ROUTE_URLS[APIRoutes.NEW_TOKEN], headers={"X-CHALLENGER": ""})
+        logger.debug("Received response with status code: %s", response.status_code)
 
-            # Проверка успешности запроса (статус 201)
-            if response.status_code == 201:
-                token = response.headers.get("X-CHALLENGER")
-                if token:
-                    # Логирование успешного получения токена (часть для безопасности)
-                    logger.info(f"Successfully received token: {token[:10]}...")
-                    # Путь к .env в корне проекта
-                    env_file = os.path.join(os.path.dirname(__file__), "..", ".env")
-                    # Нормализуем путь для кросс-платформенности
-                    env_file = os.path.normpath(env_file)
-                    logger.debug(f"Using .env file path: {env_file}")
+        # Проверка успешности запроса (статус 201)
+        if response.status_code == 201:
+            token = response.headers.get("X-CHALLENGER")
+            if token:
+                # Логирование успешного получения токена (часть для безопасности)
+                logger.info("Successfully received token: %s...", token[:10])
+                logger.debug("Using .env file path: %s", ENV_FILE)
 
-                    # Загружаем текущие переменные и обновляем токен
-                    try:
-                        load_dotenv(env_file)
+                # Загружаем текущие переменные и обновляем токен
+                try:
+                    current_token = os.environ.get("API_X_CHALLENGER")
+                    if current_token == token:
+                        # Токен не изменился: перезапись .env не нужна
+                        logger.info("Token is unchanged, skipping .env update")
+                    else:
+                        if current_token is None:
+                            load_dotenv(ENV_FILE)
                         # Обновляем или добавляем API_X_CHALLENGER в .env
-                        set_key(env_file, "API_X_CHALLENGER", token)
+                        set_key(ENV_FILE, "API_X_CHALLENGER", token)
                         # Обновляем os.environ для текущей сессии
                         os.environ["API_X_CHALLENGER"] = token
+                        refresh_challenger_token()
                         logger.info("Token successfully saved to .env and updated in os.environ")
-                    except Exception as e:
-                        # Логирование ошибки при сохранении токена
-                        logger.error(f"Failed to save token to .env or update os.environ: {e}")
-                        raise
-                else:
-                    # Логирование и прикрепление предупреждения об отсутствии заголовка
-                    err = "Received successful response, but 'X-CHALLENGER' header is missing."
-                    logger.warning(err)
-                    allure.attach(err, name="Header is missing", attachment_type=allure.attachment_type.TEXT)
+                except Exception as e:
+                    # Логирование ошибки при сохранении токена
+                    logger.error("Failed to save token to .env or update os.environ: %s", e)
+                    raise
             else:
-                # Логирование и прикрепление ошибки при неудачном запросе
-                err = f"Failed to get new token. Status Code: {response.status_code}"
-                logger.error(err)
-                allure.attach(err, name="Failed to get token", attachment_type=allure.attachment_type.TEXT)
-            return response
-        except Exception as e:
-            # Логирование общей ошибки при генерации токена
-            logger.error(f"Failed to generate new challenger token: {e}")
-            raise
+                # Логирование и прикрепление предупреждения об отсутствии заголовка
+                err = "Received successful response, but 'X-CHALLENGER' header is missing."
+                logger.warning(err)
+                allure.attach(err, name="Header is missing", attachment_type=allure.attachment_type.TEXT)
+        else:
+            # Логирование и прикрепление ошибки при неудачном запросе
+            err = f"Failed to get new token. Status Code: {response.status_code}"
+            logger.error(err)
+            allure.attach(err, name="Failed to get token", attachment_type=allure.attachment_type.TEXT)
+        return response
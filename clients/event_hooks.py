@@ -17,7 +17,7 @@ def log_request_event_hook(request: Request):
 
     :param request: Объект запроса HTTPX.
     """
-    logger.info(f'Make {request.method} request to {request.url}')
+    logger.info("Make %s request to %s", request.method, request.url)
 
 
 def log_response_event_hook(response: Response):
@@ -27,5 +27,5 @@ def log_response_event_hook(response: Response):
     :param response: Объект ответа HTTPX.
     """
     logger.info(
-        f"Got response {response.status_code} {response.reason_phrase} from {response.url}"
+        "Got response %s %s from %s", response.status_code, response.reason_phrase, response.url
     )
\ No newline at end of file
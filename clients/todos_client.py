@@ -1,9 +1,10 @@
 from tools.logger import get_logger
 from clients.base_client import BaseClient
-from config.api_routes import APIRoutes
+from config.api_routes import APIRoutes, ROUTE_URLS
+from tools.headers import CanonicalHeaders
 import allure
 from httpx import Response
-from typing import Optional
+from typing import Iterable, List, Optional, Sequence, Tuple
 
 logger = get_logger(__name__)
 
@@ -13,11 +14,15 @@ class TodosClient(BaseClient):
 
     Наследуется от BaseClient, предоставляет методы для взаимодействия с API задач.
     """
+    __slots__ = ("_todo_url_prefix",)
+
     def __init__(self, client):
         super().__init__(client)
         # Установка эндпоинта для работы с API задач
         self._endpoint = APIRoutes.TODOS.value
-        logger.info("TodosClient initialized with endpoint: " + self._endpoint)
+        # Префикс URL конкретной задачи вычисляется один раз
+        self._todo_url_prefix = self._endpoint + "/"
+        logger.info("TodosClient initialized with endpoint: %s", self._endpoint)
 
     @allure.step("Get all todos")
     def get_all_todos(self, headers: Optional[dict[str, str]] = None, params: Optional[dict[str, str]] = None) -> Response:
@@ -28,15 +33,27 @@ class TodosClient(BaseClient):
         :param params: Query-параметры для запроса
         :return: Объект Response с результатом запроса
         """
-        try:
-            # Выполнение GET-запроса к эндпоинту задач
-            response = self.get(APIRoutes.TODOS.value, headers=headers, params=params)
-            logger.info(f"Successfully fetched all todos, status code: {response.status_code}")
-            return response
-        except Exception as e:
-            # Логирование ошибки при выполнении запроса
-            logger.error(f"Failed to fetch all todos: {e}")
-            raise
+        # Выполнение GET-запроса к эндпоинту задач
+        response = self.get(ROUTE_URLS[APIRoutes.TODOS], headers=headers, params=params)
+        logger.info("Successfully fetched all todos, status code: %s", response.status_code)
+        return response
+
+    @allure.step("Get all todos for several header and params sets")
+    def get_all_todos_many(self, cases: Sequence[Tuple[Optional[dict[str, str]], Optional[dict[str, str]]]],
+                           max_workers: int = 8) -> List[Response]:
+        """
+        Получает список всех задач параллельно для нескольких наборов заголовков и query-параметров.
+
+        :param cases: Пары (заголовки, query-параметры), по одной на запрос
+        :param max_workers: Максимальное число одновременных запросов
+        :return: Список Response в порядке переданных пар
+        """
+        logger.info("Fetching all todos for %s cases", len(cases))
+        url = ROUTE_URLS[APIRoutes.TODOS]
+        calls = [(url, {"params": params, "headers": CanonicalHeaders.of(headers)}) for headers, params in cases]
+        responses = self._request_many("GET", calls, max_workers=max_workers)
+        logger.info("Successfully fetched all todos for %s cases", len(responses))
+        return responses
 
     @allure.step("Get specific todo")
     def get_specific_todo(self, todo_id: int, headers: Optional[dict[str, str]] = None) ->Response:
@@ -47,18 +64,28 @@ class TodosClient(BaseClient):
         :param headers: Дополнительные заголовки для запроса (переопределяют дефолтные)
         :return: Объект Response с результатом запроса
         """
-        logger.info(f"Fetching specific todo with ID: {todo_id}")
-        logger.debug(f"Request parameters - headers: {headers}")
-        try:
-            # Формирование URL для запроса конкретной задачи
-            url = f"{APIRoutes.TODOS.value}/{todo_id}"
-            # Выполнение GET-запроса
-            response = self.get(url, headers=headers)
-            logger.info(f"Successfully fetched todo with ID {todo_id}, status code: {response.status_code}")
-            return response
-        except Exception as e:
-            # Логирование ошибки при выполнении запроса
-            logger.error(f"Failed to fetch todo with ID {todo_id}: {e}")
-            raise
+        logger.info("Fetching specific todo with ID: %s", todo_id)
+        logger.debug("Request parameters - headers: %s", headers)
+        # Формирование URL для запроса конкретной задачи
+        url = self._todo_url_prefix + str(todo_id)
+        # Выполнение GET-запроса
+        response = self.get(url, headers=headers)
+        logger.info("Successfully fetched todo with ID %s, status code: %s", todo_id, response.status_code)
+        return response
 
+    @allure.step("Get specific todos in bulk")
+    def get_todos_bulk(self, todo_ids: Iterable[int], headers: Optional[dict[str, str]] = None,
+                       max_workers: int = 16) -> List[Response]:
+        """
+        Получает несколько задач по их ID параллельно через общий пул соединений клиента.
 
+        :param todo_ids: ID получаемых записей
+        :param headers: Дополнительные заголовки для всех запросов (переопределяют дефолтные)
+        :param max_workers: Максимальное число одновременных запросов
+        :return: Список Response в порядке переданных ID
+        """
+        urls = [self._todo_url_prefix + str(todo_id) for todo_id in todo_ids]
+        logger.info("Fetching %s todos in bulk", len(urls))
+        responses = self.get_many(urls, headers=headers, max_workers=max_workers)
+        logger.info("Successfully fetched %s todos in bulk", len(responses))
+        return responses
@@ -1,9 +1,15 @@
 from enum import Enum
 
+from httpx import URL
+
 class APIRoutes(Enum):
     """
     Маршруты API для ChallengesClient.
     """
     NEW_TOKEN = "/challenger"
     CHALLENGES = "/challenges"
-    TODOS = "/todos"
\ No newline at end of file
+    TODOS = "/todos"
+
+
+# Предварительно разобранные URL маршрутов: httpx не разбирает строку пути при каждом запросе
+ROUTE_URLS: dict[APIRoutes, URL] = {route: URL(route.value) for route in APIRoutes}
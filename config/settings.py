@@ -1,3 +1,6 @@
+import logging
+from functools import cached_property, lru_cache
+
 from pydantic import HttpUrl, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
@@ -15,12 +18,13 @@ class Settings(BaseSettings):
         Настройки проекта для тестирования API.
 
         Загружает переменные из файла `.env`.
-        Предоставляет конфигурацию для URL API, таймаута, токена X-Challenger и уровня логирования.
+        Предоставляет конфигурацию для URL API, таймаута, пула соединений, токена X-Challenger и уровня логирования.
         """
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        # Логирование инициализированных настроек для отладки
-        logger.debug(f"Settings initialized: {self.model_dump()}")
+        # Логирование инициализированных настроек для отладки (model_dump только при включенном DEBUG)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Settings initialized: %s", self.model_dump())
         logger.info("Settings class successfully instantiated")
 
     # Конфигурация для настроек Pydantic
@@ -32,9 +36,21 @@ class Settings(BaseSettings):
 
     api_url: HttpUrl
     api_timeout: float = 10.0
+    # Параметры пула соединений HTTP-клиента (HTTP/2 согласуется только по https)
+    api_http2: bool = True
+    api_max_connections: int = 100
+    api_max_keepalive_connections: int = 20
+    api_keepalive_expiry: float = 300.0
     api_x_challenger: str
     log_level: str = "DEBUG"  # Уровень логирования по умолчанию
 
+    @cached_property
+    def api_url_str(self) -> str:
+        """
+        URL API в виде строки, вычисляется один раз для объекта настроек.
+        """
+        return str(self.api_url)
+
     @field_validator("api_timeout")
     @classmethod
     def validate_timeout(cls, v: float) -> float:
@@ -54,3 +70,13 @@ class Settings(BaseSettings):
             raise ValueError("X-Challenger token cannot be empty")
         logger.debug(f"X-Challenger token validated successfully")
         return v
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Возвращает объект настроек, создаваемый и валидируемый один раз на процесс.
+
+    :return: Экземпляр Settings
+    """
+    return Settings()
@@ -4,25 +4,45 @@ from config.settings import Settings
 from clients.challenges_client import ChallengesClient
 from clients.todos_client import TodosClient
 from tools.logger import get_logger
-from typing import Iterator
+from typing import Any, Iterator, List
 
 logger = get_logger(__name__)
 
 @pytest.fixture(scope="session")
-def client(settings: Settings) -> Iterator[httpx.Client]:
+def client(settings: Settings, request: pytest.FixtureRequest) -> Iterator[httpx.Client]:
     """
     Фикстура создаёт HTTP-клиент с настройками из Settings.
 
+    При запуске через pytest-xdist каждый воркер получает свою сессию и свой пул соединений.
+
     :param settings: Объект настроек из класса Settings
+    :param request: Объект запроса pytest (идентификатор воркера xdist берется из config.workerinput)
     :return: Итератор, предоставляющий HTTP-клиент httpx.Client
     """
-    logger.info("Creating HTTP client for test session")
+    # Без xdist (в том числе с -p no:xdist) workerinput отсутствует, сессия считается "master"
+    worker_id = getattr(request.config, "workerinput", {}).get("workerid", "master")
+    logger.info("Creating HTTP client for test session on worker %s", worker_id)
     try:
+        # Один пул keep-alive соединений с HTTP/2 на всю сессию: запросы переиспользуют соединение
+        # вместо повторного TCP/TLS рукопожатия. При передаче transport параметры http2/limits
+        # задаются именно на нём, httpx.Client их в этом случае игнорирует
+        if settings.api_http2 and settings.api_url.scheme != "https":
+            logger.warning("HTTP/2 is negotiated only over https, falling back to HTTP/1.1 for %s", settings.api_url)
+        transport = httpx.HTTPTransport(
+            http2=settings.api_http2,
+            limits=httpx.Limits(
+                max_connections=settings.api_max_connections,
+                max_keepalive_connections=settings.api_max_keepalive_connections,
+                keepalive_expiry=settings.api_keepalive_expiry
+            ),
+            retries=1
+        )
         client = httpx.Client(
-            base_url=str(settings.api_url),
-            timeout=settings.api_timeout
+            base_url=settings.api_url_str,
+            timeout=settings.api_timeout,
+            transport=transport
         )
-        logger.debug(f"HTTP client created with base URL: {settings.api_url} and timeout: {settings.api_timeout}")
+        logger.debug("HTTP client created with base URL: %s and timeout: %s", settings.api_url, settings.api_timeout)
         yield client
         # Логирование закрытия клиента
         logger.debug("Closing HTTP client")
@@ -30,7 +50,7 @@ def client(settings: Settings) -> Iterator[httpx.Client]:
         logger.info("HTTP client closed successfully")
     except Exception as e:
         # Логирование ошибки при создании или закрытии клиента
-        logger.error(f"Failed to create or close HTTP client: {e}")
+        logger.error("Failed to create or close HTTP client: %s", e)
         raise
 
 @pytest.fixture(scope="session")
@@ -48,7 +68,7 @@ def challenges_client(client: httpx.Client) -> ChallengesClient:
         return challenges_client
     except Exception as e:
         # Логирование ошибки при создании ChallengesClient
-        logger.error(f"Failed to create ChallengesClient: {e}")
+        logger.error("Failed to create ChallengesClient: %s", e)
         raise
 
 @pytest.fixture(scope="session")
@@ -66,5 +86,18 @@ def todos_client(client: httpx.Client) -> TodosClient:
         return todos_client
     except Exception as e:
         # Логирование ошибки при создании TodosClient
-        logger.error(f"Failed to create TodosClient: {e}")
-        raise
\ No newline at end of file
+        logger.error("Failed to create TodosClient: %s", e)
+        raise
+
+@pytest.fixture(scope="session")
+def available_todo_ids(todos_client: TodosClient) -> List[Any]:
+    """
+    Фикстура получает список доступных ID задач один раз на всю тестовую сессию.
+
+    :param todos_client: Экземпляр TodosClient
+    :return: Список ID задач
+    """
+    logger.info("Fetching available todo IDs for test session")
+    ids = todos_client.get_available_ids()
+    logger.debug("Available todo IDs: %s", ids)
+    return ids
@@ -1,5 +1,6 @@
+import logging
 import pytest
-from config.settings import Settings
+from config.settings import Settings, get_settings
 from tools.logger import get_logger
 from pydantic import ValidationError
 
@@ -16,12 +17,13 @@ def settings() -> Settings:
     # Попытка создания объекта настроек
     try:
         logger.info("Attempting to load settings for test session")
-        settings = Settings()
-        # Логирование успешно загруженных настроек
-        logger.debug(f"Settings loaded successfully: {settings.model_dump()}")
+        settings = get_settings()
+        # Логирование успешно загруженных настроек (model_dump только при включенном DEBUG)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Settings loaded successfully: %s", settings.model_dump())
         logger.info("Settings fixture initialized for test session")
         return settings
     # Обработка ошибок валидации настроек
     except ValidationError as e:
-        logger.error(f"Failed to load settings: {e}")
+        logger.error("Failed to load settings: %s", e)
         raise
@@ -10,6 +10,53 @@ from tools.assertions.schema.todos_model import TodosSchema
 from tools.assertions.challenges_assertions import ChallengesAsserts
 from tools.assertions.todos_assertions import TodosAsserts
 from tools.assertions.schema.xsd_paths import XSDPaths
+from tools.attachments import is_allure_verbose
+
+# Наборы заголовков для GET /challenges: все случаи проверяются в одном тесте, запросы идут параллельно
+GET_CHALLENGES_CASES = [
+    (None, HTTPStatus.OK),  # Заголовки по умолчанию (из settings)
+    ({"X-Challenger": ""}, HTTPStatus.OK),  # Пустой X-Challenger
+    ({"X-Challenger": "test_token", "Accept": "application/xml"}, HTTPStatus.OK),  # Дополнительный заголовок
+    ({"Authorization": "Bearer invalid"}, HTTPStatus.OK),  # Неверный заголовок
+]
+GET_CHALLENGES_IDS = [
+    "default_headers",
+    "empty_token",
+    "Accept_with_application/xml",
+    "invalid_authorization"
+]
+
+# Заголовки и query-параметры для GET /todos: все случаи проверяются в одном тесте, запросы идут параллельно
+GET_TODOS_CASES = [
+    (None, None, HTTPStatus.OK),  # Заголовки по умолчанию (из settings)
+    (None, {"doneStatus": True}, HTTPStatus.OK),  # query параметр/фильтр
+    ({"X-Challenger": ""}, None, HTTPStatus.OK),  # Пустой X-Challenger
+    ({"X-Challenger": "test_token", "Accept": "application/xml"}, None, HTTPStatus.OK),  # Дополнительный заголовок
+    (None, {"id": 3}, HTTPStatus.OK),  # query параметр/фильтр
+    ({"Authorization": "Bearer invalid"}, None, HTTPStatus.OK),  # Неверный заголовок
+]
+GET_TODOS_IDS = [
+    "default_headers",
+    "doneStatus: True",
+    "empty_token",
+    "Accept_with_application/xml",
+    "id: 3",
+    "Wrong token"
+]
+
+# ID задачи (None - случайный из доступных) и заголовки для GET /todos/{id}
+GET_TODO_BY_ID_CASES = [
+    (None, None, HTTPStatus.OK),  # случайный ID, Заголовки по умолчанию (из settings)
+    (5, {"X-Challenger": ""}, HTTPStatus.OK),  # Определенный ID со статусом True
+    (150, None, HTTPStatus.NOT_FOUND),  # несуществующий ID
+    (None, {"Accept": "application/xml"}, HTTPStatus.OK)  # ответ в XML
+]
+GET_TODO_BY_ID_IDS = [
+    "random ID",
+    "specific ID",
+    "Wrong ID",
+    "Random ID XML"
+]
 
 
 @pytest.mark.challenges
@@ -23,93 +70,87 @@ class TestChallenges:
         @allure.title("Get new challenger token")
         def test_01_get_new_challenger(self, challenges_client):
             response = challenges_client.generate_new_challenger()
-            self.assert_status_code(response, 201)
-            self.assert_response_time(response, max_time=5.0)
-            self.assert_headers_present(response, ["X-CHALLENGER", "Location"])
+            checks = {
+                "status_code": HTTPStatus.CREATED,
+                "response_time": 5.0,
+                "headers_present": ["X-CHALLENGER", "Location"]
+            }
+            self.comprehensive_checks(response=response, checks=checks)
 
     @allure.story("First Real Challenge")
     class TestFirstRealChallenge(ChallengesAsserts):
+        # Общая часть проверок: создается один раз на класс, в тестах дополняется изменяемыми полями
+        _BASE_CHECKS = {
+            "response_time": 5.0,
+            "schema": True,
+            "headers_present": ["content-type"],
+            "header_values": None,
+            "key_present": ["challenges"],
+        }
 
         @pytest.mark.regression
-        @allure.title("Get all challenges. Using extra headers[{headers}]")
-        @pytest.mark.parametrize(
-            "headers, expected_status",
-            [
-                (None, HTTPStatus.OK),  # Заголовки по умолчанию (из settings)
-                ({"X-Challenger": ""}, HTTPStatus.OK),  # Пустой X-Challenger
-                ({"X-Challenger": "test_token", "Accept": "application/xml"}, HTTPStatus.OK),  # Дополнительный заголовок
-                ({"Authorization": "Bearer invalid"}, HTTPStatus.OK),  # Неверный заголовок
-            ],
-            ids=[
-                "default_headers",
-                "empty_token",
-                "Accept_with_application/xml",
-                "invalid_authorization"
-            ]
-        )
-        def test_02_get_challenges(self, challenges_client: ChallengesClient, headers: dict | None, expected_status: int):
+        @allure.title("Get all challenges. Using extra headers")
+        def test_02_get_challenges(self, challenges_client: ChallengesClient):
             """
-            Тестирует GET /challenges с различными заголовками.
+            Тестирует GET /challenges с различными заголовками (случаи из GET_CHALLENGES_CASES).
             """
-            checks = {
-                "status_code": expected_status,
-                "response_time": 5.0,
-                "schema": True,
-                "headers_present": ["content-type"],
-                "header_values": None,
-                "key_present": ["challenges"],
-                "key_value": {"id": 59},
-                "request_headers": headers
-            }
-            response = challenges_client.get_challenges_api(headers=headers)
-            self.comprehensive_checks(response=response, checks=checks)
+            responses = challenges_client.get_challenges_api_many([headers for headers, _ in GET_CHALLENGES_CASES])
+            # Ошибка одного случая не прерывает проверку остальных: все ошибки собираются и выводятся вместе
+            failures = []
+            for case_id, (headers, expected_status), response in zip(GET_CHALLENGES_IDS, GET_CHALLENGES_CASES, responses):
+                try:
+                    with allure.step(f"Case {case_id}: headers={headers}"):
+                        checks = {
+                            **self._BASE_CHECKS,
+                            "status_code": expected_status,
+                            "key_value": {"id": 59},
+                            "request_headers": headers
+                        }
+                        self.comprehensive_checks(response=response, checks=checks)
+                except AssertionError as e:
+                    failures.append(f"Case {case_id}: {e}")
+            if failures:
+                pytest.fail(f"{len(failures)} of {len(GET_CHALLENGES_CASES)} cases failed:\n" + "\n\n".join(failures))
 
 
     @allure.story("Get Challenges")
     class TestGetChallenges(TodosAsserts):
+        # Общая часть проверок: создается один раз на класс, в тестах дополняется изменяемыми полями
+        _BASE_CHECKS = {
+            "response_time": 5.0,
+            "schema": True,
+            "headers_present": ["content-type"],
+            "header_values": None,
+            "key_present": ["todos"],
+        }
 
         @pytest.mark.regression
-        @allure.title("Get all todos. Headers[{headers}] Params [{params}]")
-        @pytest.mark.parametrize(
-            "headers, params, expected_status",
-            [
-                (None, None, HTTPStatus.OK),  # Заголовки по умолчанию (из settings)
-                (None, {"doneStatus": True},HTTPStatus.OK),  # query параметр/фильтр
-                ({"X-Challenger": ""},None, HTTPStatus.OK),  # Пустой X-Challenger
-                ({"X-Challenger": "test_token", "Accept": "application/xml"}, None, HTTPStatus.OK),  # Дополнительный
-                # заголовок
-                (None, {"id": 3}, HTTPStatus.OK),  # query параметр/фильтр
-                ({"Authorization": "Bearer invalid"}, None, HTTPStatus.OK),  # Неверный заголовок
-            ],
-            ids=[
-                "default_headers",
-                "doneStatus: True",
-                "empty_token",
-                "Accept_with_application/xml",
-                "id: 3",
-                "Wrong token"
-            ]
-        )
-        def test_03_get_all_todos(self, todos_client: TodosClient, headers: dict | None, params: dict |
-                                                                                                 None, expected_status:
-        int):
+        @allure.title("Get all todos. Using extra headers and params")
+        def test_03_get_all_todos(self, todos_client: TodosClient):
             """
-            Тестирует GET /todos с различными заголовками.
+            Тестирует GET /todos с различными заголовками и query-параметрами (случаи из GET_TODOS_CASES).
             """
-            checks = {
-                "status_code": expected_status,
-                "response_time": 5.0,
-                "schema": True,
-                "headers_present": ["content-type"],
-                "header_values": None,
-                "key_present": ["todos"],
-                "key_value": params,
-                "request_headers": headers
-            }
-            response = todos_client.get_all_todos(headers=headers, params=params)
-            self.comprehensive_checks(response=response, checks=checks)
-            if params:
-                self.check_query_filter(response=response, params=params)
+            responses = todos_client.get_all_todos_many([(headers, params) for headers, params, _ in GET_TODOS_CASES])
+            # Ошибка одного случая не прерывает проверку остальных: все ошибки собираются и выводятся вместе
+            failures = []
+            for case_id, (headers, params, expected_status), response in zip(GET_TODOS_IDS, GET_TODOS_CASES, responses):
+                try:
+                    with allure.step(f"Case {case_id}: headers={headers}, params={params}"):
+                        checks = {
+                            **self._BASE_CHECKS,
+                            "status_code": expected_status,
+                            "key_value": params,
+                            "request_headers": headers
+                        }
+                        self.comprehensive_checks(response=response, checks=checks)
+                        if params:
+                            self.check_query_filter(
+                                response=response, params=params, is_xml=self.is_xml_request(headers)
+                            )
+                except AssertionError as e:
+                    failures.append(f"Case {case_id}: {e}")
+            if failures:
+                pytest.fail(f"{len(failures)} of {len(GET_TODOS_CASES)} cases failed:\n" + "\n\n".join(failures))
 
         @pytest.mark.extension
         @allure.title("GET request on the incorrect '/todo' endpoint")
@@ -122,42 +163,23 @@ class TestChallenges:
 
         @pytest.mark.regression
         @allure.title("GET todo with ID [{todo_id}] (None for random)")
-        @pytest.mark.parametrize(
-            "todo_id, headers, expected_status",
-            [
-                (None, None, HTTPStatus.OK),  # случайный ID, Заголовки по умолчанию (из settings)
-                (5, {"X-Challenger": ""}, HTTPStatus.OK),  # Определенный ID со статусом True
-                (150, None, HTTPStatus.NOT_FOUND),
-                # несуществующий ID
-                (None, {"Accept": "application/xml"}, HTTPStatus.OK) # ответ в XML
-            ],
-            ids=[
-                "random ID",
-                "specific ID",
-                "Wrong ID",
-                "Random ID XML"
-            ]
-        )
-        def test_05_get_specific_todo(self, todos_client: TodosClient, todo_id: int, headers: dict | None, expected_status:
-        int):
+        @pytest.mark.parametrize("todo_id, headers, expected_status", GET_TODO_BY_ID_CASES, ids=GET_TODO_BY_ID_IDS)
+        def test_05_get_specific_todo(self, todos_client: TodosClient, available_todo_ids: list, todo_id: int,
+                                      headers: dict | None, expected_status: int):
             """
             Тестирует GET /todos{id} с различными заголовками.
             """
             checks = {
+                **self._BASE_CHECKS,
                 "status_code": expected_status,
-                "response_time": 5.0,
-                "schema": True,
-                "headers_present": ["content-type"],
-                "header_values": None,
-                "key_present": ["todos"],
                 "key_value": {"id": todo_id},
                 "request_headers": headers
             }
             if todo_id is None:
-                available_ids = todos_client.get_available_ids()
-                todo_id = random.choice(available_ids)
+                todo_id = random.choice(available_todo_ids)
                 checks["key_value"] = {"id": todo_id}
-                allure.attach(str(id), name="Random ID", attachment_type=allure.attachment_type.TEXT)
+                if is_allure_verbose():
+                    allure.attach(str(todo_id), name="Random ID", attachment_type=allure.attachment_type.TEXT)
 
             response = todos_client.get_specific_todo(todo_id=todo_id, headers=headers)
             self.comprehensive_checks(response=response, checks=checks)
@@ -168,7 +190,10 @@ class TestChallenges:
         @allure.title("HEAD request /todos")
         def test_head_request_todos(self, todos_client: TodosClient):
             response = todos_client.head(url="/todos")
-            self.assert_status_code(response=response, expected_status=200)
-            self.assert_headers_present(response=response, expected_headers=["X-CHALLENGER"])
+            checks = {
+                "status_code": HTTPStatus.OK,
+                "headers_present": ["X-CHALLENGER"]
+            }
+            self.comprehensive_checks(response=response, checks=checks)
 
 
@@ -1,15 +1,203 @@
 from httpx import Response
 import allure
-import json
-from typing import Dict, List, Any, Optional, Type
-from pydantic import BaseModel, ValidationError
-import xml.etree.ElementTree as ET
+import os
+import re
+import weakref
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple, Type
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from pydantic_core import from_json
 from lxml import etree
 from tools.logger import get_logger
 from tools.assertions.schema.xsd_paths import XSDPaths
+from tools.attachments import allure_step, is_allure_verbose
 
 logger = get_logger(__name__)
 
+
+@lru_cache(maxsize=None)
+def get_schema_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """
+    Возвращает TypeAdapter для Pydantic-схемы, создаваемый один раз на схему.
+
+    :param schema: Класс Pydantic-схемы
+    :return: TypeAdapter со скомпилированным валидатором схемы
+    """
+    return TypeAdapter(schema)
+
+
+def _collect_key_values(data: Any, found: Dict[str, List[Any]]) -> None:
+    """
+    Собирает значения всех искомых ключей JSON за один обход структуры.
+
+    Обход итеративный (явный стек) вместо рекурсии: без накладных расходов на вызовы функций
+    и без ограничения глубины рекурсии. Порядок значений соответствует порядку в документе.
+
+    :param data: Разобранный JSON (dict, list и т.д.)
+    :param found: Словарь "искомый ключ -> список найденных значений", дополняется на месте
+    """
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        # from_json возвращает обычные dict/list, поэтому достаточно точной проверки типа
+        if type(node) is dict:
+            for key, value in node.items():
+                matches = found.get(key)
+                if matches is not None:
+                    matches.append(value)
+            stack.extend(reversed(node.values()))
+        elif type(node) is list:
+            stack.extend(reversed(node))
+
+
+def _find_unmatched_key_values(data: Any, expected_values: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """
+    Ищет в JSON для каждого ключа хотя бы одно значение, равное ожидаемому.
+
+    Ключ перестает отслеживаться после первого совпадения, обход прекращается, как только
+    совпадения найдены для всех ключей.
+
+    :param data: Разобранный JSON (dict, list и т.д.)
+    :param expected_values: Словарь с ключами и их ожидаемыми значениями
+    :return: Для ключей без совпадения - все найденные значения (пустой список, если ключ не найден)
+    """
+    pending: Dict[str, List[Any]] = {key: [] for key in expected_values}
+    stack = [data]
+    while stack and pending:
+        node = stack.pop()
+        if type(node) is dict:
+            for key, value in node.items():
+                matches = pending.get(key)
+                if matches is not None:
+                    if value == expected_values[key]:
+                        del pending[key]
+                    else:
+                        matches.append(value)
+            stack.extend(reversed(node.values()))
+        elif type(node) is list:
+            stack.extend(reversed(node))
+    return pending
+
+
+# Снимки заголовков ответов: ответ -> dict (ключи в нижнем регистре, повторы объединены)
+_RESPONSE_HEADERS: "weakref.WeakKeyDictionary[Response, Dict[str, str]]" = weakref.WeakKeyDictionary()
+
+
+def _response_headers(response: Response) -> Dict[str, str]:
+    """
+    Возвращает заголовки ответа в виде обычного dict, формируемого один раз на ответ.
+
+    Проверки наличия и значений заголовков, а также определение content-type
+    в comprehensive_checks работают с одним снимком, без повторного обхода httpx.Headers.
+
+    :param response: Объект HTTP-ответа (httpx.Response)
+    :return: Словарь "имя заголовка в нижнем регистре -> значение"
+    """
+    headers = _RESPONSE_HEADERS.get(response)
+    if headers is None:
+        headers = _RESPONSE_HEADERS[response] = dict(response.headers.items())
+    return headers
+
+
+# Разобранные JSON-ответы: ответ -> тело (запись удаляется вместе с объектом ответа)
+_PARSED_JSON: "weakref.WeakKeyDictionary[Response, Any]" = weakref.WeakKeyDictionary()
+_NOT_PARSED = object()
+
+
+def _parse_json_body(response: Response) -> Any:
+    """
+    Возвращает разобранное JSON-тело ответа, разбирая его не более одного раза на ответ.
+
+    Проверки ключей и значений в comprehensive_checks работают с одним результатом разбора.
+    Результат используется только для чтения.
+
+    :param response: Объект HTTP-ответа (httpx.Response)
+    :return: Разобранный JSON (dict, list и т.д.)
+    :raises ValueError: Если тело ответа не является валидным JSON
+    """
+    body = _PARSED_JSON.get(response, _NOT_PARSED)
+    if body is _NOT_PARSED:
+        body = _PARSED_JSON[response] = from_json(response.content)
+    return body
+
+
+# Переиспользуемый парсер XML-ответов (libxml2), без подстановки внешних сущностей
+_XML_PARSER = etree.XMLParser(huge_tree=False, recover=False, resolve_entities=False)
+
+# Разобранные XML-ответы: ответ -> корневой элемент (запись удаляется вместе с объектом ответа)
+_PARSED_XML: "weakref.WeakKeyDictionary[Response, etree._Element]" = weakref.WeakKeyDictionary()
+
+
+def _parse_xml_body(response: Response) -> etree._Element:
+    """
+    Возвращает корневой элемент XML-тела ответа, разбирая тело не более одного раза на ответ.
+
+    Проверки схемы, наличия и значений тегов в comprehensive_checks работают с одним деревом.
+    Дерево используется только для чтения.
+
+    :param response: Объект HTTP-ответа (httpx.Response)
+    :return: Корневой элемент lxml
+    :raises etree.XMLSyntaxError: Если тело ответа не является валидным XML
+    """
+    root = _PARSED_XML.get(response)
+    if root is None:
+        root = _PARSED_XML[response] = etree.fromstring(response.content, _XML_PARSER)
+    return root
+
+# Простое имя тега без пространства имен и спецсимволов XPath (ASCII-подмножество NCName)
+_PLAIN_TAG_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_.-]*")
+
+
+@lru_cache(maxsize=128)
+def _tag_xpath(tag: str) -> etree.XPath:
+    """
+    Возвращает скомпилированное XPath-выражение поиска всех потомков с указанным тегом.
+
+    :param tag: Простое имя тега (см. _PLAIN_TAG_RE)
+    :return: Объект etree.XPath для выражения './/tag'
+    """
+    return etree.XPath(f".//{tag}")
+
+
+def _has_descendant_tag(root: etree._Element, tag: str) -> bool:
+    """
+    Проверяет, есть ли у элемента потомок с указанным тегом (сам элемент не учитывается).
+
+    Для простых имен используется скомпилированный XPath из кэша, для остальных (Clark-нотация
+    "{ns}tag", пути и т.п.) - root.findall, как и раньше: XPath для них не компилируется.
+
+    :param root: Корневой элемент lxml
+    :param tag: Имя тега или выражение ElementPath
+    :return: True, если найден хотя бы один потомок
+    """
+    if _PLAIN_TAG_RE.fullmatch(tag):
+        return bool(_tag_xpath(tag)(root))
+    return bool(root.findall(f".//{tag}"))
+
+
+# Скомпилированные XSD-схемы: путь -> (время изменения файла, схема)
+_XSD_SCHEMAS: Dict[str, Tuple[float, etree.XMLSchema]] = {}
+
+
+def _load_xsd_schema(xsd_file: str) -> etree.XMLSchema:
+    """
+    Возвращает скомпилированную XSD-схему, перечитывая файл только при его изменении.
+
+    :param xsd_file: Путь к XSD-файлу
+    :return: Объект etree.XMLSchema
+    :raises IOError: Если файл недоступен
+    :raises etree.ParseError: Если файл не является корректным XML
+    """
+    mtime = os.path.getmtime(xsd_file)
+    cached = _XSD_SCHEMAS.get(xsd_file)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    schema = etree.XMLSchema(etree.parse(xsd_file))
+    _XSD_SCHEMAS[xsd_file] = (mtime, schema)
+    logger.debug("XSD schema compiled and cached: %s", xsd_file)
+    return schema
+
+
 class BaseResponseAsserts:
     """
     Базовый класс для проверок HTTP-ответов с Allure-отчетами.
@@ -19,8 +207,9 @@ class BaseResponseAsserts:
     schema: Optional[Type[BaseModel]] = None
     xsd_path: Optional[str] = None
 
-    @allure.step("Check status code is {expected_status}")
-    def assert_status_code(self, response: Response, expected_status: int) -> None:
+    @staticmethod
+    @allure_step("Check status code is {expected_status}")
+    def assert_status_code(response: Response, expected_status: int) -> None:
         """
         Проверяет, что статус-код ответа равен ожидаемому.
 
@@ -28,20 +217,21 @@ class BaseResponseAsserts:
         :param expected_status: Ожидаемый статус-код
         :raises AssertionError: Если статус-код не совпадает с ожидаемым
         """
-        logger.info(f"Checking status code, expected: {expected_status}")
+        logger.info("Checking status code, expected: %s", expected_status)
         actual_status = response.status_code
         if actual_status != expected_status:
-            logger.error(f"Status code mismatch: expected {expected_status}, got {actual_status}")
+            logger.error("Status code mismatch: expected %s, got %s", expected_status, actual_status)
             allure.attach(
                 f"Expected: {expected_status}\nActual: {actual_status}",
                 name="Status Code Mismatch",
                 attachment_type=allure.attachment_type.TEXT
             )
             raise AssertionError(f"Expected status code {expected_status}, got {actual_status}")
-        logger.debug(f"Status code check passed: {actual_status}")
+        logger.debug("Status code check passed: %s", actual_status)
 
-    @allure.step("Check response time is less than {max_time} seconds")
-    def assert_response_time(self, response: Response, max_time: float) -> None:
+    @staticmethod
+    @allure_step("Check response time is less than {max_time} seconds")
+    def assert_response_time(response: Response, max_time: float) -> None:
         """
         Проверяет, что время отклика меньше указанного порога (в секундах).
 
@@ -49,25 +239,28 @@ class BaseResponseAsserts:
         :param max_time: Максимально допустимое время ответа в секундах
         :raises AssertionError: Если время ответа превышает порог
         """
-        logger.info(f"Checking response time, max allowed: {max_time}s")
+        logger.info("Checking response time, max allowed: %ss", max_time)
         elapsed_time = response.elapsed.total_seconds()
-        allure.attach(
-            f"Response time: {elapsed_time:.3f}s\nMax allowed: {max_time:.3f}s",
-            name="Response Time",
-            attachment_type=allure.attachment_type.TEXT
-        )
+        # Информационное вложение для успешной проверки формируется только в подробном режиме
+        if is_allure_verbose():
+            allure.attach(
+                f"Response time: {elapsed_time:.3f}s\nMax allowed: {max_time:.3f}s",
+                name="Response Time",
+                attachment_type=allure.attachment_type.TEXT
+            )
         if elapsed_time > max_time:
-            logger.error(f"Response time {elapsed_time:.3f}s exceeds max {max_time:.3f}s")
+            logger.error("Response time %.3fs exceeds max %.3fs", elapsed_time, max_time)
             allure.attach(
                 f"Elapsed: {elapsed_time:.3f}s\nMax allowed: {max_time:.3f}s",
                 name="Response Time Exceeded",
                 attachment_type=allure.attachment_type.TEXT
             )
             raise AssertionError(f"Response time {elapsed_time:.3f}s exceeds max {max_time:.3f}s")
-        logger.debug(f"Response time check passed: {elapsed_time:.3f}s")
+        logger.debug("Response time check passed: %.3fs", elapsed_time)
 
-    @allure.step("Check headers present: {expected_headers}")
-    def assert_headers_present(self, response: Response, expected_headers: List[str]) -> None:
+    @staticmethod
+    @allure_step("Check headers present: {expected_headers}")
+    def assert_headers_present(response: Response, expected_headers: List[str]) -> None:
         """
         Проверяет наличие указанных заголовков в ответе.
 
@@ -75,20 +268,24 @@ class BaseResponseAsserts:
         :param expected_headers: Список ожидаемых заголовков
         :raises AssertionError: Если хотя бы один заголовок отсутствует
         """
-        logger.info(f"Checking for presence of headers: {expected_headers}")
-        missing_headers = [h for h in expected_headers if h.lower() not in response.headers]
+        logger.info("Checking for presence of headers: %s", expected_headers)
+        # Имена заголовков ответа (в нижнем регистре) берутся из общего снимка:
+        # проверка каждого ожидаемого заголовка - поиск по хешу, а не линейный проход по списку заголовков
+        present_headers = _response_headers(response)
+        missing_headers = [h for h in expected_headers if h.lower() not in present_headers]
         if missing_headers:
-            logger.error(f"Headers not found: {missing_headers}")
+            logger.error("Headers not found: %s", missing_headers)
             allure.attach(
-                f"Missing headers: {missing_headers}\nAvailable headers: {list(response.headers.keys())}",
+                f"Missing headers: {missing_headers}\nAvailable headers: {list(present_headers)}",
                 name="Missing Headers",
                 attachment_type=allure.attachment_type.TEXT
             )
             raise AssertionError(f"Headers not found: {missing_headers}")
-        logger.debug(f"Header presence check passed for: {expected_headers}")
+        logger.debug("Header presence check passed for: %s", expected_headers)
 
-    @allure.step("Check header values: {expected_headers}")
-    def assert_header_values(self, response: Response, expected_headers: Dict[str, str]) -> None:
+    @staticmethod
+    @allure_step("Check header values: {expected_headers}")
+    def assert_header_values(response: Response, expected_headers: Dict[str, str]) -> None:
         """
         Проверяет значения указанных заголовков в ответе.
 
@@ -96,24 +293,27 @@ class BaseResponseAsserts:
         :param expected_headers: Словарь с ожидаемыми заголовками и их значениями
         :raises AssertionError: Если значения заголовков не совпадают
         """
-        logger.info(f"Checking header values: {expected_headers}")
+        logger.info("Checking header values: %s", expected_headers)
+        # Общий для всех проверок снимок заголовков (ключи в нижнем регистре, повторы объединены)
+        response_headers = _response_headers(response)
         mismatches = []
         for header, expected_value in expected_headers.items():
-            actual_value = response.headers.get(header.lower())
+            actual_value = response_headers.get(header.lower())
             if actual_value != expected_value:
                 mismatches.append(f"{header}: expected '{expected_value}', got '{actual_value}'")
         if mismatches:
-            logger.error(f"Header value mismatches: {mismatches}")
+            logger.error("Header value mismatches: %s", mismatches)
             allure.attach(
                 "\n".join(mismatches),
                 name="Header Value Mismatches",
                 attachment_type=allure.attachment_type.TEXT
             )
             raise AssertionError(f"Header value mismatches:\n{'\n'.join(mismatches)}")
-        logger.debug(f"Header values check passed for: {expected_headers}")
+        logger.debug("Header values check passed for: %s", expected_headers)
 
-    @allure.step("Check body keys present: {expected_keys}")
-    def assert_body_keys_present(self, response: Response, expected_keys: List[str]) -> None:
+    @staticmethod
+    @allure_step("Check body keys present: {expected_keys}")
+    def assert_body_keys_present(response: Response, expected_keys: List[str]) -> None:
         """
         Проверяет наличие указанных ключей в теле ответа (JSON).
 
@@ -121,26 +321,27 @@ class BaseResponseAsserts:
         :param expected_keys: Список ожидаемых ключей в JSON
         :raises AssertionError: Если JSON невалидный или ключи отсутствуют
         """
-        logger.info(f"Checking for presence of body keys: {expected_keys}")
+        logger.info("Checking for presence of body keys: %s", expected_keys)
         try:
-            body = response.json()
+            body = _parse_json_body(response)
         except ValueError as e:
-            logger.error(f"Response body is not JSON: {e}")
+            logger.error("Response body is not JSON: %s", e)
             raise AssertionError(f"Response body is not JSON: {e}")
 
         missing_keys = [k for k in expected_keys if k not in body]
         if missing_keys:
-            logger.error(f"Body keys not found: {missing_keys}")
+            logger.error("Body keys not found: %s", missing_keys)
             allure.attach(
                 f"Missing keys: {missing_keys}\nAvailable keys: {list(body.keys())}",
                 name="Missing Body Keys",
                 attachment_type=allure.attachment_type.JSON
             )
             raise AssertionError(f"Body keys not found: {missing_keys}")
-        logger.debug(f"Body keys presence check passed for: {expected_keys}")
+        logger.debug("Body keys presence check passed for: %s", expected_keys)
 
-    @allure.step("Check body key values: {expected_values}")
-    def assert_body_key_values(self, response: Response, expected_values: Dict[str, Any]) -> None:
+    @staticmethod
+    @allure_step("Check body key values: {expected_values}")
+    def assert_body_key_values(response: Response, expected_values: Dict[str, Any]) -> None:
         """
         Проверяет, что хотя бы одна запись в JSON-теле ответа содержит указанные ключи с ожидаемыми значениями.
 
@@ -148,11 +349,11 @@ class BaseResponseAsserts:
         :param expected_values: Словарь с ключами и их ожидаемыми значениями
         :raises AssertionError: Если JSON невалидный или ни одна запись не содержит ожидаемого значения
         """
-        logger.info(f"Checking body key values: {expected_values}")
+        logger.info("Checking body key values: %s", expected_values)
         try:
-            body = response.json()
+            body = _parse_json_body(response)
         except ValueError as e:
-            logger.error(f"Response body is not valid JSON: {e}")
+            logger.error("Response body is not valid JSON: %s", e)
             allure.attach(
                 response.text,
                 name="Invalid JSON",
@@ -160,36 +361,20 @@ class BaseResponseAsserts:
             )
             raise AssertionError(f"Response body is not valid JSON: {e}")
 
-        def find_key_values(data: Any, key: str, matches: List[Any]) -> None:
-            """
-            Рекурсивно ищет все вхождения ключа в JSON и собирает их значения.
-
-            :param data: Текущий JSON-объект (dict, list и т.д.)
-            :param key: Искомый ключ
-            :param matches: Список для хранения найденных значений
-            """
-            if isinstance(data, dict):
-                if key in data:
-                    matches.append(data[key])
-                for value in data.values():
-                    find_key_values(value, key, matches)
-            elif isinstance(data, list):
-                for item in data:
-                    find_key_values(item, key, matches)
+        # Один обход тела, который останавливается, как только для всех ключей найдены совпадения
+        unmatched = _find_unmatched_key_values(body, expected_values)
 
         mismatches = []
-        for key, expected_value in expected_values.items():
-            matches = []
-            find_key_values(body, key, matches)
+        for key, matches in unmatched.items():
             if not matches:
                 mismatches.append(f"{key}: key not found in any record")
-            elif not any(actual_value == expected_value for actual_value in matches):
+            else:
                 mismatches.append(
-                    f"{key}: expected '{expected_value}', found values {matches}"
+                    f"{key}: expected '{expected_values[key]}', found values {matches}"
                 )
 
         if mismatches:
-            logger.error(f"Body key value mismatches: {mismatches}")
+            logger.error("Body key value mismatches: %s", mismatches)
             allure.attach(
                 "\n".join(mismatches),
                 name="Body Key Value Mismatches",
@@ -201,7 +386,7 @@ class BaseResponseAsserts:
                 attachment_type=allure.attachment_type.JSON
             )
             raise AssertionError(f"Body key value mismatches:\n{'\n'.join(mismatches)}")
-        logger.debug(f"Body key values check passed for: {expected_values}")
+        logger.debug("Body key values check passed for: %s", expected_values)
 
     def assert_json_schema(self, response: Response, schema: type[BaseModel]) -> None:
         """
@@ -212,25 +397,24 @@ class BaseResponseAsserts:
         :raises AssertionError: Если JSON невалидный или не соответствует схеме
         :raises TypeError: Если schema не является классом Pydantic
         """
-        logger.info(f"Validating JSON schema: {schema.__name__}")
+        logger.info("Validating JSON schema: %s", schema.__name__)
         if not isinstance(schema, type) or not issubclass(schema, BaseModel):
-            logger.error(f"Invalid schema type: expected Pydantic model, got {type(schema).__name__}")
+            logger.error("Invalid schema type: expected Pydantic model, got %s", type(schema).__name__)
             raise TypeError(f"Expected Pydantic model class, got {type(schema).__name__}")
 
-        try:
-            body = response.json()
-        except ValueError as e:
-            logger.error(f"Response body is not JSON: {e}")
-            raise AssertionError(f"Response body is not JSON: {e}")
-
         with allure.step(f"Validate JSON schema: {schema.__name__}"):
             try:
-                schema(**body)
-                logger.debug(f"JSON schema validation passed for: {schema.__name__}")
+                # Разбор и валидация за один проход в pydantic-core, без промежуточного dict
+                get_schema_adapter(schema).validate_json(response.content)
+                logger.debug("JSON schema validation passed for: %s", schema.__name__)
             except ValidationError as e:
-                logger.error(f"Schema validation failed: {e}")
+                if e.errors()[0]["type"] == "json_invalid":
+                    logger.error("Response body is not JSON: %s", e)
+                    raise AssertionError(f"Response body is not JSON: {e}")
+                logger.error("Schema validation failed: %s", e)
+                # Тело прикладывается как есть: форматирование JSON выполняет отчет Allure
                 allure.attach(
-                    json.dumps(body, indent=2, ensure_ascii=False),
+                    response.content,
                     name="Invalid Data",
                     attachment_type=allure.attachment_type.JSON
                 )
@@ -241,8 +425,9 @@ class BaseResponseAsserts:
                 )
                 raise AssertionError(f"Schema validation failed: {e}")
 
-    @allure.step("Check XML tags present: {expected_tags}")
-    def assert_xml_tag_present(self, response: Response, expected_tags: List[str]) -> None:
+    @staticmethod
+    @allure_step("Check XML tags present: {expected_tags}")
+    def assert_xml_tag_present(response: Response, expected_tags: List[str]) -> None:
         """
         Проверяет наличие всех указанных тегов в XML-теле ответа.
 
@@ -250,11 +435,11 @@ class BaseResponseAsserts:
         :param expected_tags: Список имен тегов
         :raises AssertionError: Если XML невалидный или хотя бы один тег отсутствует
         """
-        logger.info(f"Checking for presence of XML tags: {expected_tags}")
+        logger.info("Checking for presence of XML tags: %s", expected_tags)
         try:
-            root = ET.fromstring(response.text)
-        except ET.ParseError as e:
-            logger.error(f"Response body is not valid XML: {e}")
+            root = _parse_xml_body(response)
+        except etree.XMLSyntaxError as e:
+            logger.error("Response body is not valid XML: %s", e)
             allure.attach(
                 response.text,
                 name="Invalid XML",
@@ -264,21 +449,22 @@ class BaseResponseAsserts:
 
         errors = []
         for tag in expected_tags:
-            if root.tag != tag and not root.findall(f".//{tag}"):
+            if root.tag != tag and not _has_descendant_tag(root, tag):
                 errors.append(f"XML tag '{tag}' not found in response")
 
         if errors:
-            logger.error(f"XML tag presence check failed: {errors}")
+            logger.error("XML tag presence check failed: %s", errors)
             allure.attach(
                 response.text,
                 name="XML Body",
                 attachment_type=allure.attachment_type.XML
             )
             raise AssertionError("\n".join(errors))
-        logger.debug(f"XML tag presence check passed for: {expected_tags}")
+        logger.debug("XML tag presence check passed for: %s", expected_tags)
 
-    @allure.step("Check XML tag values: {tag_value_pairs}")
-    def assert_xml_tag_value(self, response: Response, tag_value_pairs: Dict[str, Any]) -> None:
+    @staticmethod
+    @allure_step("Check XML tag values: {tag_value_pairs}")
+    def assert_xml_tag_value(response: Response, tag_value_pairs: Dict[str, Any]) -> None:
         """
         Проверяет, что хотя бы одно вхождение каждого тега в XML-теле ответа имеет ожидаемое значение.
 
@@ -286,11 +472,11 @@ class BaseResponseAsserts:
         :param tag_value_pairs: Словарь с тегами и их ожидаемыми значениями
         :raises AssertionError: Если XML невалидный, тег отсутствует или ни одно значение не совпадает
         """
-        logger.info(f"Checking XML tag values: {tag_value_pairs}")
+        logger.info("Checking XML tag values: %s", tag_value_pairs)
         try:
-            root = ET.fromstring(response.text)
-        except ET.ParseError as e:
-            logger.error(f"Response body is not valid XML: {e}")
+            root = _parse_xml_body(response)
+        except etree.XMLSyntaxError as e:
+            logger.error("Response body is not valid XML: %s", e)
             allure.attach(
                 response.text,
                 name="Invalid XML",
@@ -298,20 +484,26 @@ class BaseResponseAsserts:
             )
             raise AssertionError(f"Response body is not valid XML: {e}")
 
+        # Значения всех искомых тегов собираются за один проход по дереву
+        found_values = {tag: [] for tag in tag_value_pairs}
+        if found_values:
+            for elem in root.iterdescendants(*found_values):
+                found_values[elem.tag].append(elem.text or "")
+
         errors = []
         for tag, expected_value in tag_value_pairs.items():
-            tag_elements = root.findall(f".//{tag}")
-            if not tag_elements:
+            actual_values = found_values[tag]
+            if not actual_values:
                 errors.append(f"XML tag '{tag}' not found in response")
                 continue
-            actual_values = [elem.text or "" for elem in tag_elements]
-            if not any(actual_value == str(expected_value) for actual_value in actual_values):
+            # Значения тегов - строки: проверка вхождения выполняется на уровне C без генератора
+            if str(expected_value) not in actual_values:
                 errors.append(
                     f"XML tag '{tag}' has no value matching '{expected_value}', found values {actual_values}"
                 )
 
         if errors:
-            logger.error(f"XML tag value mismatches: {errors}")
+            logger.error("XML tag value mismatches: %s", errors)
             allure.attach(
                 response.text,
                 name="XML Body",
@@ -323,22 +515,25 @@ class BaseResponseAsserts:
                 attachment_type=allure.attachment_type.TEXT
             )
             raise AssertionError("\n".join(errors))
-        logger.debug(f"XML tag values check passed for: {tag_value_pairs}")
+        logger.debug("XML tag values check passed for: %s", tag_value_pairs)
 
-    @allure.step("Validate XML schema: {xsd_file}")
-    def assert_xml_schema(self, response: Response, xsd_file: str = XSDPaths.CHALLENGES_XSD.path) -> None:
+    @allure_step("Validate XML schema: {xsd_file}")
+    def assert_xml_schema(self, response: Response, xsd_file: Optional[str] = None) -> None:
         """
         Проверяет, что XML-тело ответа соответствует указанной XSD-схеме.
 
         :param response: Объект HTTP-ответа (httpx.Response)
-        :param xsd_file: Путь к XSD-файлу
+        :param xsd_file: Путь к XSD-файлу (по умолчанию - схема "/challenges")
         :raises AssertionError: Если XML невалидный или не соответствует схеме
         """
-        logger.info(f"Validating XML schema with file: {xsd_file}")
+        if xsd_file is None:
+            # Путь по умолчанию вычисляется при вызове, а не при импорте модуля
+            xsd_file = XSDPaths.CHALLENGES_XSD.path
+        logger.info("Validating XML schema with file: %s", xsd_file)
         try:
-            xml_doc = etree.fromstring(response.text.encode("utf-8"))
-        except etree.ParseError as e:
-            logger.error(f"Response body is not valid XML: {e}")
+            xml_doc = _parse_xml_body(response)
+        except etree.XMLSyntaxError as e:
+            logger.error("Response body is not valid XML: %s", e)
             allure.attach(
                 response.text,
                 name="Invalid XML",
@@ -347,18 +542,17 @@ class BaseResponseAsserts:
             raise AssertionError(f"Response body is not valid XML: {e}")
 
         try:
-            with open(xsd_file, "rb") as f:
-                schema_root = etree.parse(f)
-                schema = etree.XMLSchema(schema_root)
+            schema = _load_xsd_schema(xsd_file)
             schema.assertValid(xml_doc)
-            allure.attach(
-                xsd_file,
-                name="XSD Schema File",
-                attachment_type=allure.attachment_type.TEXT
-            )
+            if is_allure_verbose():
+                allure.attach(
+                    xsd_file,
+                    name="XSD Schema File",
+                    attachment_type=allure.attachment_type.TEXT
+                )
             logger.debug("XML schema validation passed")
         except (etree.DocumentInvalid, IOError, etree.ParseError) as e:
-            logger.error(f"XML does not match schema: {e}")
+            logger.error("XML does not match schema: %s", e)
             allure.attach(
                 response.text,
                 name="Invalid XML Schema",
@@ -366,74 +560,96 @@ class BaseResponseAsserts:
             )
             raise AssertionError(f"XML does not match schema: {e}")
 
+    @staticmethod
+    def is_xml_request(request_headers: Optional[Dict[str, str]]) -> bool:
+        """
+        Определяет по заголовкам запроса, ожидается ли ответ в формате XML.
+
+        :param request_headers: Заголовки запроса (None - заголовки по умолчанию)
+        :return: True, если запрошен ответ в XML (Accept: application/xml)
+        """
+        return request_headers is not None and request_headers.get("Accept") == "application/xml"
+
+    @staticmethod
+    def extract_xml_key_values(response: Response, data_keys_to_extract: Dict[str, Any]) -> Dict[str, List[Any]]:
+        """
+        Извлекает значения для заданных тегов из XML ответа без проверки content-type.
+
+        :param response: Объект HTTP-ответа (httpx.Response)
+        :param data_keys_to_extract: Словарь, где ключи - искомые теги
+        :return: Словарь, где ключи - искомые теги, а значения - списки найденных значений
+        :raises AssertionError: Если тело ответа не является валидным XML
+        """
+        all_found_values: Dict[str, List[Any]] = {key: [] for key in data_keys_to_extract} # Инициализируем списки для каждого искомого ключа
+        try:
+            root = _parse_xml_body(response)
+        except etree.XMLSyntaxError as e:
+            logger.error("Response body is not valid XML: %s", e)
+            allure.attach(
+                response.text,
+                name="Invalid XML",
+                attachment_type=allure.attachment_type.TEXT
+            )
+            raise AssertionError(f"Response body is not valid XML: {e}")
+        # Один проход по потомкам корня, фильтрация по всем искомым тегам сразу на стороне libxml2
+        # (без тегов iterdescendants вернул бы все элементы)
+        if all_found_values:
+            for elem in root.iterdescendants(*all_found_values):
+                all_found_values[elem.tag].append(elem.text or "")
+        logger.debug("Extracted XML values: %s", all_found_values)
+        return all_found_values
+
+    @staticmethod
+    def extract_json_key_values(response: Response, data_keys_to_extract: Dict[str, Any]) -> Dict[str, List[Any]]:
+        """
+        Извлекает значения для заданных ключей из JSON ответа без проверки content-type.
+
+        :param response: Объект HTTP-ответа (httpx.Response)
+        :param data_keys_to_extract: Словарь, где ключи - искомые ключи JSON
+        :return: Словарь, где ключи - искомые ключи, а значения - списки найденных значений
+        :raises AssertionError: Если тело ответа не является валидным JSON
+        """
+        all_found_values: Dict[str, List[Any]] = {key: [] for key in data_keys_to_extract} # Инициализируем списки для каждого искомого ключа
+        try:
+            body = _parse_json_body(response)
+        except ValueError as e:
+            logger.error("Response body is not valid JSON: %s", e)
+            allure.attach(
+                response.text,
+                name="Invalid JSON Response",
+                attachment_type=allure.attachment_type.JSON
+            )
+            raise AssertionError(f"Response body is not valid JSON: {e}")
+        # Значения всех искомых ключей собираются за один обход тела
+        _collect_key_values(body, all_found_values)
+        logger.debug("Extracted JSON values: %s", all_found_values)
+        return all_found_values
+
     def get_all_key_values(self, response: Response, data_keys_to_extract: Dict[str, Any]):
         """
-        Извлекает значения для заданных ключей из XML или JSON ответа.
+        Извлекает значения для заданных ключей из XML или JSON ответа, выбирая формат по content-type.
 
         :param response: Объект HTTP-ответа (httpx.Response)
         :param data_keys_to_extract: Словарь, где ключи - искомые теги/ключи
         :return: Словарь, где ключи - искомые теги/ключи, а значения - списки найденных значений
         :raises AssertionError: Если тело ответа невалидное (XML или JSON)
         """
-        logger.info(f"Extracting key values: {data_keys_to_extract.keys()}")
-        all_found_values: Dict[str, List[Any]] = {key: [] for key in data_keys_to_extract} # Инициализируем списки для каждого искомого ключа
-        content_type = response.headers.get("content-type", "")
-        logger.debug(f"Content type detected: {content_type}")
+        logger.info("Extracting key values: %s", data_keys_to_extract.keys())
+        content_type = _response_headers(response).get("content-type", "")
+        logger.debug("Content type detected: %s", content_type)
         if "application/xml" in content_type:
-            try:
-                root = ET.fromstring(response.text)
-                for tag in data_keys_to_extract:
-                    tag_elements = root.findall(f".//{tag}")
-                    all_found_values[tag] = [elem.text or "" for elem in tag_elements]
-                logger.debug(f"Extracted XML values: {all_found_values}")
-            except ET.ParseError as e:
-                logger.error(f"Response body is not valid XML: {e}")
-                allure.attach(
-                    response.text,
-                    name="Invalid XML",
-                    attachment_type=allure.attachment_type.TEXT
-                )
-                raise AssertionError(f"Response body is not valid XML: {e}")
+            all_found_values = self.extract_xml_key_values(response, data_keys_to_extract)
         elif "application/json" in content_type:
-            try:
-                body = response.json()
-
-                def _find_values_recursively(current_data: Any, target_key: str, found_list: List[Any]) -> None:
-                    """
-                    Рекурсивно ищет все вхождения target_key в JSON и собирает их значения.
-
-                    :param current_data: Текущий JSON-объект (dict, list и т.д.)
-                    :param target_key: Искомый ключ
-                    :param found_list: Список для хранения найденных значений
-                    """
-                    if isinstance(current_data, dict):
-                        if target_key in current_data:
-                            found_list.append(current_data[target_key])
-                        for value_in_dict in current_data.values():
-                            _find_values_recursively(value_in_dict, target_key, found_list)
-                    elif isinstance(current_data, list):
-                        for item_in_list in current_data:
-                            _find_values_recursively(item_in_list, target_key, found_list)
-
-                for key_to_find in data_keys_to_extract:  # Итерируемся по ключам
-                    _find_values_recursively(body, key_to_find, all_found_values[key_to_find])
-                logger.debug(f"Extracted JSON values: {all_found_values}")
-            except ValueError as e:
-                logger.error(f"Response body is not valid JSON: {e}")
-                allure.attach(
-                    response.text,
-                    name="Invalid JSON Response",
-                    attachment_type=allure.attachment_type.JSON
-                )
-                raise AssertionError(f"Response body is not valid JSON: {e}")
+            all_found_values = self.extract_json_key_values(response, data_keys_to_extract)
         else:
-            logger.warning(f"Unsupported content type: {content_type}. Skipping value extraction")
+            logger.warning("Unsupported content type: %s. Skipping value extraction", content_type)
             allure.attach(
                 response.text,
                 name="Unsupported Content Type",
                 attachment_type=allure.attachment_type.TEXT
             )
-        logger.info(f"Key values extraction completed: {all_found_values}")
+            all_found_values = {key: [] for key in data_keys_to_extract}
+        logger.info("Key values extraction completed: %s", all_found_values)
         return all_found_values
 
     def comprehensive_checks(self, response: Response, checks: Dict[str, Any]):
@@ -446,7 +662,7 @@ class BaseResponseAsserts:
         :raises ValueError: Если схема для валидации не определена
         """
         logger.info("Starting comprehensive checks for API response")
-        logger.debug(f"Checks to perform: {checks}")
+        logger.debug("Checks to perform: %s", checks)
 
         try:
             if checks.get("status_code"):
@@ -458,18 +674,21 @@ class BaseResponseAsserts:
             if checks.get("header_values"):
                 self.assert_header_values(response, checks["header_values"])
             if response.is_success:
-                is_xml = checks["request_headers"] is not None and checks["request_headers"].get(
-                    "Accept") == "application/xml"
+                request_headers = checks.get("request_headers")
+                is_xml = self.is_xml_request(request_headers)
                 if checks.get("schema"):
+                    # Тип содержимого известен из Accept запроса: при совпадении проверяется напрямую,
+                    # при расхождении - через assert_header_values (шаг Allure и вложение с расхождением)
+                    expected_content_type = "application/xml" if is_xml else "application/json"
+                    if _response_headers(response).get("content-type") != expected_content_type:
+                        self.assert_header_values(response, {"content-type": expected_content_type})
                     if is_xml:
-                        self.assert_header_values(response, {"content-type": "application/xml"})
                         if self.xsd_path is not None:
                             self.assert_xml_schema(response, self.xsd_path)
                         else:
                             logger.error("XSD path not defined for XML schema validation")
                             raise ValueError("XSD path not defined for XML schema validation")
                     else:
-                        self.assert_header_values(response, {"content-type": "application/json"})
                         if self.schema is not None:
                             self.assert_json_schema(response, self.schema)
                         else:
@@ -487,5 +706,5 @@ class BaseResponseAsserts:
                         self.assert_body_key_values(response, checks["key_value"])
             logger.info("Comprehensive checks completed successfully")
         except Exception as e:
-            logger.error(f"Comprehensive checks failed: {e}")
+            logger.error("Comprehensive checks failed: %s", e)
             raise
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
 from enum import Enum
+from functools import cached_property
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,14 +15,15 @@ class XSDPaths(Enum):
     CHALLENGES_XSD = os.path.join(CURRENT_DIR, "challenges.xsd")
     TODOS_XSD = os.path.join(CURRENT_DIR, "todos.xsd")
 
-    @property
+    @cached_property
     def path(self) -> str:
         """
         Возвращает путь к XSD-файлу, проверяя его существование.
+        Проверка выполняется при первом успешном обращении, далее путь берется из кэша члена перечисления.
         :return: Путь к файлу (str).
         :raises FileNotFoundError: Если файл не существует.
         """
-        logger.debug(f"Accessing path: {self.value}")
+        logger.debug("Accessing path: %s", self.value)
         if not os.path.exists(self.value):
             raise FileNotFoundError(f"XSD file not found: {self.value}")
         return self.value
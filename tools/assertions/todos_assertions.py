@@ -1,13 +1,11 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from tools.logger import get_logger
 from httpx import Response
-from pydantic import BaseModel, ValidationError
 from tools.assertions.base_assertions import BaseResponseAsserts
 from tools.assertions.schema.todos_model import TodosSchema
 from tools.assertions.schema.xsd_paths import XSDPaths
+from tools.attachments import allure_step, is_allure_verbose
 import allure
-import json
-import xml.etree.ElementTree as ET
 
 logger = get_logger(__name__)
 
@@ -22,33 +20,43 @@ class TodosAsserts(BaseResponseAsserts):
     # Путь к XSD-файлу для валидации XML-ответов
     xsd_path = XSDPaths.TODOS_XSD.path
 
-    @allure.step("Check request query filter")
-    def check_query_filter(self, response: Response, params: Dict[str, Any]):
+    @allure_step("Check request query filter")
+    def check_query_filter(self, response: Response, params: Dict[str, Any], is_xml: Optional[bool] = None):
         """
         Проверяет, что для каждого ключа либо все найденные значения совпадают с ожидаемым,
         либо ключ вовсе отсутствует в ответе.
 
         :param response: Объект HTTP-ответа (httpx.Response)
         :param params: Словарь с ключами и их ожидаемыми значениями
+        :param is_xml: Формат ответа, если он известен заранее (None - определяется по content-type)
         :raises AssertionError: Если ключ найден, но значения не совпадают с ожидаемым,
                                 или если найдены значения, когда они не ожидались
         """
-        logger.info(f"Starting query filter check with parameters: {params}")
-        allure.attach(
-            str(params),
-            name="Параметры для проверки фильтрации",
-            attachment_type=allure.attachment_type.TEXT
-        )
-        try:
-            values = self.get_all_key_values(response=response, data_keys_to_extract=params)
-            logger.debug(f"Extracted values from response: {values}")
+        logger.info("Starting query filter check with parameters: %s", params)
+        # Информационные вложения успешной проверки формируются только в подробном режиме
+        if is_allure_verbose():
             allure.attach(
-                str(values),
-                name="Извлеченные значения из ответа",
+                str(params),
+                name="Параметры для проверки фильтрации",
                 attachment_type=allure.attachment_type.TEXT
             )
+        try:
+            # Если формат ответа известен вызывающему, извлечение выполняется без разбора content-type
+            if is_xml is None:
+                values = self.get_all_key_values(response=response, data_keys_to_extract=params)
+            elif is_xml:
+                values = self.extract_xml_key_values(response, params)
+            else:
+                values = self.extract_json_key_values(response, params)
+            logger.debug("Extracted values from response: %s", values)
+            if is_allure_verbose():
+                allure.attach(
+                    str(values),
+                    name="Извлеченные значения из ответа",
+                    attachment_type=allure.attachment_type.TEXT
+                )
         except AssertionError as e:
-            logger.error(f"Failed to extract values from response: {e}")
+            logger.error("Failed to extract values from response: %s", e)
             allure.attach(
                 response.text,
                 name="Ответ, вызвавший ошибку извлечения",
@@ -60,18 +68,19 @@ class TodosAsserts(BaseResponseAsserts):
             for key, expected_value in params.items():
                 found_data_list: List[Any] = values.get(key, [])
 
-                allure.attach(
-                    f"Ключ: '{key}', Ожидаемое значение: '{expected_value}', Найденные значения: {found_data_list}",
-                    name=f"Детали проверки для ключа '{key}'",
-                    attachment_type=allure.attachment_type.TEXT
-                )
-                logger.info(f"Checking key '{key}'. Expected: '{expected_value}'. Found: {found_data_list}")
+                if is_allure_verbose():
+                    allure.attach(
+                        f"Ключ: '{key}', Ожидаемое значение: '{expected_value}', Найденные значения: {found_data_list}",
+                        name=f"Детали проверки для ключа '{key}'",
+                        attachment_type=allure.attachment_type.TEXT
+                    )
+                logger.info("Checking key '%s'. Expected: '%s'. Found: %s", key, expected_value, found_data_list)
 
                 if found_data_list:
                     # Проверяем, что каждое найденное значение совпадает с ожидаемым
                     for found_value in found_data_list:
                         if found_value == expected_value:
-                            logger.debug(f"Value '{found_value}' for key '{key}' matches expected '{expected_value}'")
+                            logger.debug("Value '%s' for key '%s' matches expected '%s'", found_value, key, expected_value)
                         else:
                             error_message = f"Mismatch for key '{key}': found value '{found_value}', but expected '{expected_value}'."
                             logger.error(error_message)
@@ -82,7 +91,7 @@ class TodosAsserts(BaseResponseAsserts):
                             )
                             raise AssertionError(error_message)
                 else:
-                    logger.debug(f"No values found for key '{key}'. This is acceptable as per 'or none' condition")
+                    logger.debug("No values found for key '%s'. This is acceptable as per 'or none' condition", key)
 
         logger.info("Query filter check completed successfully")
 
@@ -1,12 +1,112 @@
-import json
+import functools
+import os
 from httpx import Response
 import allure
-from typing import Any, Dict, List
-import xml.etree.ElementTree as ET
+from allure_commons import plugin_manager
+from pydantic_core import from_json, to_json
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple, TypeVar, Union
+from lxml import etree
+from tools.headers import CanonicalHeaders
 from tools.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Переиспользуемый парсер для форматирования XML: пробельные узлы отбрасываются, внешние сущности не подставляются
+_FORMAT_XML_PARSER = etree.XMLParser(remove_blank_text=True, recover=False, resolve_entities=False)
+
+# Allure-вложения можно отключить переменной окружения ALLURE_ENABLED=0
+_ALLURE_ENABLED = os.environ.get("ALLURE_ENABLED", "1") != "0"
+
+def is_allure_enabled() -> bool:
+    """
+    Проверяет, будут ли Allure-вложения кем-либо приняты.
+
+    Вложения не нужны, если они отключены через ALLURE_ENABLED=0 или если ни один плагин Allure
+    не принимает вложения (например, pytest запущен без --alluredir).
+
+    :return: True, если вложения стоит формировать
+    """
+    return _ALLURE_ENABLED and bool(plugin_manager.hook.attach_data.get_hookimpls())
+
+# Дополнительные (необязательные) вложения включаются переменной окружения ALLURE_VERBOSE
+_ALLURE_VERBOSE = bool(os.environ.get("ALLURE_VERBOSE"))
+
+def is_allure_verbose() -> bool:
+    """
+    Проверяет, нужно ли формировать дополнительные Allure-вложения (например, вспомогательные данные тестов).
+
+    :return: True, если задан ALLURE_VERBOSE и вложения вообще принимаются
+    """
+    return _ALLURE_VERBOSE and is_allure_enabled()
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+def allure_step(title: str) -> Callable[[_F], _F]:
+    """
+    Декоратор шага Allure, который не работает вхолостую вне Allure-прогона.
+
+    allure.step на каждый вызов форматирует заголовок по аргументам (в том числе крупные словари)
+    и создает узел отчета. Если слушателя шагов нет (pytest запущен без --alluredir),
+    функция вызывается напрямую.
+
+    :param title: Заголовок шага в формате allure.step (например, "Check status code is {expected_status}")
+    :return: Декоратор функции
+    """
+    def decorator(func: _F) -> _F:
+        stepped = allure.step(title)(func)
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if plugin_manager.hook.start_step.get_hookimpls():
+                return stepped(*args, **kwargs)
+            return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+def _render_headers(headers: Mapping[str, str]) -> str:
+    """
+    Формирует текст заголовков для Allure-вложения: по строке "имя: значение" на заголовок.
+
+    :param headers: Заголовки запроса или ответа
+    :return: Текстовый блок заголовков
+    """
+    # Строки собираются через map со связанным format - цикл выполняется на уровне C
+    return "\n".join(map("{0[0]}: {0[1]}".format, headers.items()))
+
+
+# Тела больше ALLURE_MAX_BODY_BYTES байт (по умолчанию 1 МиБ) прикладываются усеченными, без форматирования
+_MAX_BODY_BYTES = int(os.environ.get("ALLURE_MAX_BODY_BYTES", 1 << 20))
+
+# Вид тела ответа по типу содержимого (без параметров вроде charset)
+_RESPONSE_BODY_KINDS = {"application/json": "json", "application/xml": "xml", "text/xml": "xml"}
+
+def _media_type(content_type: Optional[str]) -> Optional[str]:
+    """
+    Выделяет тип содержимого без параметров: "Application/JSON; charset=utf-8" -> "application/json".
+
+    :param content_type: Значение заголовка Content-Type (может отсутствовать)
+    :return: Тип содержимого в нижнем регистре или None
+    """
+    if not content_type:
+        return None
+    return content_type.split(";", 1)[0].strip().lower()
+
+def _attach_truncated_body(body: Union[str, bytes], name: str) -> None:
+    """
+    Прикладывает к Allure-отчету начало слишком большого тела запроса или ответа как текст.
+
+    :param body: Тело запроса или ответа
+    :param name: Имя вложения (к нему добавляется пометка об усечении и полный размер)
+    """
+    data = body.encode("utf-8") if isinstance(body, str) else body
+    logger.warning("%s is %d bytes, attaching the first %d bytes only", name, len(data), _MAX_BODY_BYTES)
+    allure.attach(
+        data[:_MAX_BODY_BYTES].decode("utf-8", errors="replace"),
+        name=f"{name} (truncated, {len(data)} bytes)",
+        attachment_type=allure.attachment_type.TEXT
+    )
+
+
 def attach_request_to_allure(method: str, url: str, headers: Dict[str, str], **kwargs: Any) -> None:
     """
     Прикрепляет данные запроса к Allure-отчету с поддержкой JSON и XML.
@@ -14,129 +114,162 @@ def attach_request_to_allure(method: str, url: str, headers: Dict[str, str], **k
     :param method: HTTP-метод запроса (GET, POST и т.д.)
     :param url: URL запроса
     :param headers: Заголовки запроса в виде словаря
-    :param kwargs: Дополнительные параметры запроса (json, xml, params и т.д.)
+    :param kwargs: Дополнительные параметры запроса (json, xml, content, params и т.д.)
     """
-    logger.info(f"Attaching request data to Allure for {method} {url}")
-    allure.attach(f"{method} {url}", name="Request", attachment_type=allure.attachment_type.TEXT)
+    logger.info("Attaching request data to Allure for %s %s", method, url)
+    # Строка запроса, заголовки и параметры собираются в одно текстовое вложение;
+    # отдельными вложениями остаются только тела JSON/XML (для подсветки синтаксиса в отчете)
+    sections = [f"{method} {url}"]
 
-    # Прикрепление заголовков запроса, если они есть
+    # Добавление заголовков запроса, если они есть
     if headers:
-        logger.debug(f"Attaching request headers: {headers}")
-        allure.attach(
-            "\n".join(f"{k}: {v}" for k, v in headers.items()),
-            name="Request Headers",
-            attachment_type=allure.attachment_type.TEXT
-        )
-
-    # Определение типа контента из заголовков
-    content_type = next((v.lower() for k, v in headers.items() if k.lower() == "content-type"), None)
-
-    # Прикрепление тела запроса в формате JSON, если оно присутствует
-    if "json" in kwargs and kwargs["json"] is not None and (content_type is None or "application/json" in content_type):
-        logger.debug(f"Attaching JSON request body: {kwargs['json']}")
-        try:
-            allure.attach(
-                json.dumps(kwargs["json"], indent=2, ensure_ascii=False),
-                name="Request Body (JSON)",
-                attachment_type=allure.attachment_type.JSON
-            )
-        except (TypeError, ValueError) as e:
-            logger.error(f"Failed to serialize JSON data for Allure: {e}")
-            allure.attach(
-                str(kwargs["json"]),
-                name="Invalid JSON Request Body",
-                attachment_type=allure.attachment_type.TEXT
-            )
+        logger.debug("Attaching request headers: %s", headers)
+        sections += ["", "Headers:", _render_headers(headers)]
 
-    # Прикрепление тела запроса в формате XML, если оно присутствует
-    if "xml" in kwargs and kwargs["xml"] is not None and (content_type is None or "application/xml" in content_type):
-        logger.debug(f"Attaching XML request body: {kwargs['xml'][:100]}...")  # Первые 100 символов для безопасности
-        try:
-            # Форматирование XML с помощью функции format_xml
-            formatted_xml = format_xml(kwargs["xml"])
-            allure.attach(
-                formatted_xml,
-                name="Request Body (XML)",
-                attachment_type=allure.attachment_type.XML
-            )
-        except Exception as e:
-            logger.error(f"Failed to format XML data for Allure: {e}")
-            allure.attach(
-                kwargs["xml"],
-                name="Invalid XML Request Body",
-                attachment_type=allure.attachment_type.TEXT
-            )
+    # Добавление параметров запроса, если они есть
+    if kwargs.get("params"):
+        logger.debug("Attaching query params: %s", kwargs["params"])
+        sections += ["", "Query params:", str(kwargs["params"])]
 
-    # Прикрепление параметров запроса, если они есть
-    if "params" in kwargs and kwargs["params"]:
-        logger.debug(f"Attaching query params: {kwargs['params']}")
-        allure.attach(
-            str(kwargs["params"]),
-            name="Request Query Params",
-            attachment_type=allure.attachment_type.TEXT
-        )
+    allure.attach("\n".join(sections), name="Request", attachment_type=allure.attachment_type.TEXT)
+
+    # Определение типа контента из заголовков: клиент передает CanonicalHeaders (ключи уже в нижнем регистре),
+    # поэтому поиск - одно обращение к словарю; прочие словари нормализуются один раз
+    content_type = CanonicalHeaders.of(headers).get("content-type")
+
+    # Тело запроса: json - объект для сериализации, xml/content - готовая строка или байты.
+    # Формат вложения выбирается одним обращением к таблице по типу содержимого
+    # (без заголовка Content-Type - по виду переданного тела)
+    media_type = _media_type(content_type)
+    if kwargs.get("json") is not None:
+        body, media_type = kwargs["json"], media_type or "application/json"
+    elif kwargs.get("xml") is not None:
+        body, media_type = kwargs["xml"], media_type or "application/xml"
+    else:
+        body = kwargs.get("content")
+    body_format = _REQUEST_BODY_FORMATS.get(media_type) if body is not None else None
+    if body_format is not None:
+        name, invalid_name, formatter, attachment_type = body_format
+        logger.debug("Attaching %s: %.100s", name, body)  # Первые 100 символов для безопасности
+        if isinstance(body, (str, bytes)) and len(body) > _MAX_BODY_BYTES:
+            _attach_truncated_body(body, name)
+        else:
+            try:
+                formatted_body = formatter(body)
+                if len(formatted_body) > _MAX_BODY_BYTES:
+                    _attach_truncated_body(formatted_body, name)
+                else:
+                    allure.attach(
+                        formatted_body if isinstance(formatted_body, str) else formatted_body.decode("utf-8"),
+                        name=name,
+                        attachment_type=attachment_type
+                    )
+            except (TypeError, ValueError) as e:
+                logger.error("Failed to format %s for Allure: %s", name, e)
+                allure.attach(
+                    body.decode("utf-8", errors="replace") if isinstance(body, bytes) else str(body),
+                    name=invalid_name,
+                    attachment_type=allure.attachment_type.TEXT
+                )
 
     # Логирование успешного завершения прикрепления
     logger.info("Request data successfully attached to Allure")
 
-def format_xml(xml_string: str, indent: str = "    ") -> str:
+# Кэшируются только тела до 64 КиБ: ключом кэша служит само тело, а хранится еще и отформатированная копия,
+# поэтому крупные тела (до ALLURE_MAX_BODY_BYTES) удерживали бы в памяти воркера десятки мегабайт
+_MEMO_MAX_BODY_BYTES = 64 * 1024
+
+def _memoize_small_bodies(func: _F) -> _F:
     """
-    Форматирует XML-строку с отступами для читаемости.
+    Кэширует результат форматирования небольших тел (последние 64 различных тела).
 
-    :param xml_string: Исходная XML-строка
+    Тела длиннее _MEMO_MAX_BODY_BYTES форматируются без кэша.
+
+    :param func: Функция форматирования, первым аргументом принимающая тело (строку или байты)
+    :return: Функция с кэшем для небольших тел
+    """
+    cached = functools.lru_cache(maxsize=64)(func)
+
+    @functools.wraps(func)
+    def wrapper(body: Union[str, bytes], *args: Any, **kwargs: Any) -> Any:
+        if len(body) > _MEMO_MAX_BODY_BYTES:
+            return func(body, *args, **kwargs)
+        return cached(body, *args, **kwargs)
+    wrapper.cache_info = cached.cache_info  # type: ignore[attr-defined]
+    wrapper.cache_clear = cached.cache_clear  # type: ignore[attr-defined]
+    return wrapper  # type: ignore[return-value]
+
+# Повторяющиеся тела (одинаковые ответы в параметризованных тестах и повторах) форматируются один раз
+@_memoize_small_bodies
+def format_xml(xml_string: Union[str, bytes], indent: str = "    ") -> str:
+    """
+    Форматирует XML с отступами для читаемости.
+
+    Разбор и сериализация выполняются в libxml2 (lxml), без рекурсивного обхода дерева в Python.
+    Результат для небольших тел кэшируется по содержимому (последние 64 различных тела).
+
+    :param xml_string: Исходный XML (строка или байты тела ответа)
     :param indent: Символы отступа (по умолчанию 4 пробела)
     :return: Форматированная XML-строка или исходная при ошибке парсинга
     """
     logger.info("Starting XML formatting")
     try:
-        # Парсим XML
-        root = ET.fromstring(xml_string)
+        # Строка кодируется в UTF-8, байты передаются как есть: кодировку определяет libxml2
+        data = xml_string.encode("utf-8") if isinstance(xml_string, str) else xml_string
+        root = etree.fromstring(data, _FORMAT_XML_PARSER)
         logger.debug("XML string parsed successfully")
-
-        def pretty_print(elem: ET.Element, level: int = 0) -> List[str]:
-            """
-            Рекурсивно форматирует XML-элемент с отступами.
-
-            :param elem: XML-элемент для форматирования
-            :param level: Уровень вложенности для отступов
-            :return: Список строк с форматированным XML
-            """
-            lines: List[str] = []
-            indent_str = indent * level
-            # Формирование открывающего тега с атрибутами
-            tag_attrs = "".join(f' {k}="{v}"' for k, v in sorted(elem.attrib.items()))
-            lines.append(f"{indent_str}<{elem.tag}{tag_attrs}>")
-
-            # Добавление текста внутри тега, если он есть
-            if elem.text and elem.text.strip():
-                lines.append(f"{indent_str}{indent}{elem.text.strip()}")
-
-            # Рекурсивная обработка дочерних элементов
-            for child in elem:
-                lines.extend(pretty_print(child, level + 1))
-
-            # Формирование закрывающего тега или пустого тега
-            if not elem.text or not elem.text.strip():
-                if not elem:
-                    lines[-1] = lines[-1][:-1] + "/>"  # Пустой тег: <tag/>
-                else:
-                    lines.append(f"{indent_str}</{elem.tag}>")
-            else:
-                lines.append(f"{indent_str}</{elem.tag}>")
-
-            return lines
-
-        # Собираем форматированный XML с заголовком
-        formatted_lines: List[str] = [r'<?xml version="1.0" encoding="utf-8"?>'] + pretty_print(root)
-        formatted_xml = "\n".join(formatted_lines)
+        etree.indent(root, space=indent)
+        formatted_xml = etree.tostring(root, xml_declaration=True, encoding="utf-8").decode("utf-8")
         logger.info("XML successfully formatted")
         return formatted_xml
-    except ET.ParseError as e:
+    except etree.XMLSyntaxError as e:
         # Логирование ошибки парсинга и возврат исходной строки
-        logger.error(f"Failed to parse XML: {e}")
+        logger.error("Failed to parse XML: %s", e)
+        if isinstance(xml_string, bytes):
+            return xml_string.decode("utf-8", errors="replace")
         return xml_string
 
 
+@_memoize_small_bodies
+def _format_json_response(content: bytes) -> str:
+    """
+    Форматирует JSON-тело ответа с отступами; результат для небольших тел кэшируется по содержимому.
+
+    Разбор байтов и форматирование выполняются в pydantic-core (Rust), без декодирования тела в str.
+
+    :param content: Тело ответа в байтах
+    :return: Форматированный JSON
+    :raises ValueError: Если тело не является валидным JSON
+    """
+    return to_json(from_json(content), indent=2).decode()
+
+
+def _format_json_body(body: Any) -> bytes:
+    """
+    Форматирует тело запроса в JSON с отступами (pydantic-core).
+
+    :param body: Объект для сериализации или готовый JSON (строка или байты)
+    :return: Форматированный JSON в кодировке UTF-8
+    :raises ValueError: Если тело не сериализуется или строка/байты не являются JSON
+    """
+    if isinstance(body, (str, bytes)):
+        body = from_json(body)
+    return to_json(body, indent=2)
+
+# Форматы тела запроса по типу содержимого: (имя вложения, имя при ошибке, форматирование, тип вложения)
+_REQUEST_BODY_FORMATS: Dict[str, Tuple[str, str, Callable[[Any], Union[str, bytes]], Any]] = {
+    "application/json": (
+        "Request Body (JSON)", "Invalid JSON Request Body", _format_json_body, allure.attachment_type.JSON
+    ),
+    "application/xml": (
+        "Request Body (XML)", "Invalid XML Request Body", format_xml, allure.attachment_type.XML
+    ),
+    "text/xml": (
+        "Request Body (XML)", "Invalid XML Request Body", format_xml, allure.attachment_type.XML
+    ),
+}
+
+
 def attach_response_to_allure(response: Response, method: str, url: str) -> None:
     """
     Прикрепляет данные ответа к Allure-отчету.
@@ -145,33 +278,43 @@ def attach_response_to_allure(response: Response, method: str, url: str) -> None
     :param method: HTTP-метод запроса
     :param url: URL запроса
     """
-    logger.info(f"Attaching response data to Allure for {method} {url}")
-    allure.attach(
-        f"HTTP/{response.http_version} {response.status_code} {response.reason_phrase}",
-        name="Response Status",
-        attachment_type=allure.attachment_type.TEXT
-    )
+    logger.info("Attaching response data to Allure for %s %s", method, url)
+    # Статус, заголовки и текстовое тело собираются в одно вложение;
+    # тела JSON/XML и усеченные тела прикладываются отдельно
+    sections = [f"HTTP/{response.http_version} {response.status_code} {response.reason_phrase}"]
 
-    # Прикрепление заголовков ответа, если они есть
+    # Добавление заголовков ответа, если они есть
     if response.headers:
-        headers_dict = dict(response.headers)  # Явное преобразование в Dict[str, str]
-        logger.debug(f"Attaching response headers: {headers_dict}")
-        allure.attach(
-            "\n".join(f"{k}: {v}" for k, v in headers_dict.items()),
-            name="Response Headers",
-            attachment_type=allure.attachment_type.TEXT
-        )
+        logger.debug("Attaching response headers: %s", response.headers)
+        sections += ["", "Headers:", _render_headers(response.headers)]
+
+    # Вид тела определяется одним разбором Content-Type и поиском в словаре; типы вида "+xml" считаются XML
+    media_type = _media_type(response.headers.get("content-type"))
+    logger.debug("Processing response body with content type: %s", media_type)
+    body_kind = _RESPONSE_BODY_KINDS.get(media_type)
+    if body_kind is None and media_type is not None and media_type.endswith("+xml"):
+        body_kind = "xml"
+    oversized = len(response.content) > _MAX_BODY_BYTES
+    is_json = body_kind == "json"
+    is_xml = body_kind == "xml"
+
+    # Тело прочих типов содержимого добавляется в общее вложение как текст
+    if response.content and not (oversized or is_json or is_xml):
+        logger.debug("Attaching response body as plain text")
+        sections += ["", "Body:", response.text]
+
+    allure.attach("\n".join(sections), name="Response", attachment_type=allure.attachment_type.TEXT)
 
     # Обработка тела ответа
-    if response.text:
-        content_type = response.headers.get("content-type", "").lower()
-        logger.debug(f"Processing response body with content type: {content_type}")
+    if response.content:
+        # Слишком большое тело прикладывается усеченным, без разбора и форматирования
+        if oversized:
+            _attach_truncated_body(response.content, "Response Body")
 
         # Обработка JSON-ответа
-        if "application/json" in content_type:
+        elif is_json:
             try:
-                # Форматируем JSON с отступами
-                formatted_json = json.dumps(response.json(), indent=2, ensure_ascii=False)
+                formatted_json = _format_json_response(response.content)
                 logger.debug("JSON response body formatted successfully")
                 allure.attach(
                     formatted_json,
@@ -180,7 +323,7 @@ def attach_response_to_allure(response: Response, method: str, url: str) -> None
                 )
             except ValueError as e:
                 # Прикрепление невалидного JSON как текста
-                logger.error(f"Failed to parse JSON response: {e}")
+                logger.error("Failed to parse JSON response: %s", e)
                 allure.attach(
                     response.text,
                     name="Response Body (Invalid JSON)",
@@ -188,21 +331,12 @@ def attach_response_to_allure(response: Response, method: str, url: str) -> None
                 )
 
         # Обработка XML-ответа
-        elif "xml" in content_type:
-            formatted_xml = format_xml(response.text)
+        elif is_xml:
+            formatted_xml = format_xml(response.content)
             logger.debug("XML response body formatted successfully")
             allure.attach(
                 formatted_xml,
                 name="Response Body (XML)",
                 attachment_type=allure.attachment_type.XML
             )
-
-        # Обработка прочих типов содержимого
-        else:
-            logger.debug("Attaching response body as plain text")
-            allure.attach(
-                response.text,
-                name="Response Body",
-                attachment_type=allure.attachment_type.TEXT
-            )
     logger.info("Response data successfully attached to Allure")
\ No newline at end of file
@@ -0,0 +1,87 @@
+from typing import Any, Iterable, Mapping, Optional, Tuple, Union
+
+HeadersInput = Union[Mapping[str, str], Iterable[Tuple[str, str]], None]
+
+
+def _lower(key: Any) -> Any:
+    """
+    Приводит строковый ключ к нижнему регистру, прочие ключи возвращает как есть (поведение обычного dict).
+
+    :param key: Ключ заголовка
+    :return: Нормализованный ключ
+    """
+    return key.lower() if isinstance(key, str) else key
+
+
+class CanonicalHeaders(dict):
+    """
+    Словарь HTTP-заголовков с ключами, приведенными к нижнему регистру.
+
+    Ключи нормализуются один раз при вставке, поэтому поиск и слияние заголовков
+    не требуют повторного приведения регистра.
+    """
+    def __init__(self, headers: HeadersInput = None, **kwargs: str):
+        super().__init__()
+        self.update(headers, **kwargs)
+
+    @classmethod
+    def of(cls, headers: HeadersInput) -> Optional["CanonicalHeaders"]:
+        """
+        Возвращает заголовки в каноническом виде без повторной нормализации.
+
+        :param headers: Заголовки (словарь, список пар или уже нормализованный CanonicalHeaders)
+        :return: Экземпляр CanonicalHeaders или None, если заголовки не переданы
+        """
+        if headers is None or isinstance(headers, cls):
+            return headers
+        return cls(headers)
+
+    def __setitem__(self, key: str, value: str) -> None:
+        super().__setitem__(_lower(key), value)
+
+    def __getitem__(self, key: str) -> str:
+        return super().__getitem__(_lower(key))
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(_lower(key))
+
+    def __contains__(self, key: object) -> bool:
+        return super().__contains__(_lower(key))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return super().get(_lower(key), default)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        return super().pop(_lower(key), *default)
+
+    def setdefault(self, key: str, default: str = None) -> str:
+        return super().setdefault(_lower(key), default)
+
+    def update(self, headers: HeadersInput = None, **kwargs: str) -> None:
+        if isinstance(headers, CanonicalHeaders):
+            super().update(headers)
+        elif headers is not None:
+            items = headers.items() if isinstance(headers, Mapping) else headers
+            super().update((_lower(k), v) for k, v in items)
+        if kwargs:
+            super().update((_lower(k), v) for k, v in kwargs.items())
+
+    def copy(self) -> "CanonicalHeaders":
+        return CanonicalHeaders(self)
+
+
+class FrozenCanonicalHeaders(CanonicalHeaders):
+    """
+    Неизменяемый вариант CanonicalHeaders для заголовков, общих для нескольких запросов.
+
+    Любая попытка изменения вызывает TypeError; copy() возвращает изменяемый CanonicalHeaders.
+    """
+    def __init__(self, headers: HeadersInput = None, **kwargs: str):
+        dict.__init__(self)
+        CanonicalHeaders.update(self, headers, **kwargs)
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("FrozenCanonicalHeaders is read-only, use copy() to get a mutable copy")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    pop = popitem = setdefault = update = clear = _readonly
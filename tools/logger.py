@@ -1,45 +1,54 @@
 import logging
+import time
+from functools import lru_cache
 
-# Инициализация базового логгера для текущего модуля
-base_logger = logging.getLogger(__name__)
 
+class _CachedTimeFormatter(logging.Formatter):
+    """
+    Formatter, который форматирует дату и время записи не чаще одного раза в секунду.
+
+    Для записей в пределах одной секунды повторно используется строка, полученная через strftime,
+    к ней добавляются только миллисекунды.
+    """
+    def __init__(self, fmt: str):
+        super().__init__(fmt)
+        # (секунда, отформатированная строка) - заменяется одним присваиванием, безопасно для потоков
+        self._last_second = (-1, "")
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str = None) -> str:
+        second = int(record.created)
+        cached_second, second_str = self._last_second
+        if second != cached_second:
+            second_str = time.strftime(self.default_time_format, self.converter(record.created))
+            self._last_second = (second, second_str)
+        return self.default_msec_format % (second_str, record.msecs)
+
+
+# Общий для всех логгеров форматтер
+_FORMATTER = _CachedTimeFormatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
+@lru_cache(maxsize=None)
 def get_logger(name: str, log_level: str = "DEBUG") -> logging.Logger:
     """
     Создает и настраивает логгер с указанным уровнем логирования.
 
+    Логгер настраивается один раз на пару (имя, уровень): повторные вызовы возвращают его из кэша.
+
     :param name: Имя логгера, обычно соответствует имени модуля
     :param log_level: Уровень логирования (по умолчанию "DEBUG")
     :return: Настроенный объект logging.Logger
+    :raises ValueError: Если указан неизвестный уровень логирования
     """
-    base_logger.info(f"Creating logger with name '{name}' and level '{log_level}'")
-
-    try:
-        # Получение или создание логгера с указанным именем
-        logger = logging.getLogger(name)
-
-        # Попытка установить уровень логирования
-        try:
-            logger.setLevel(log_level)
-            base_logger.debug(f"Log level set to '{log_level}' for logger '{name}'")
-        except ValueError as e:
-            base_logger.error(f"Invalid log level '{log_level}': {e}")
-            raise ValueError(f"Invalid log level '{log_level}': {e}")
-
-        # Проверка, есть ли уже обработчики, чтобы избежать дублирования
-        if not logger.handlers:
-            # Создание обработчика для вывода логов в консоль
-            handler = logging.StreamHandler()
-            # Настройка формата логов
-            formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-            handler.setFormatter(formatter)
-            # Добавление обработчика к логгеру
-            logger.addHandler(handler)
-            base_logger.debug(f"Stream handler and formatter added to logger '{name}'")
-
-        base_logger.info(f"Logger '{name}' successfully configured")
-        return logger
-
-    except Exception as e:
-        # Логирование ошибки при настройке логгера
-        base_logger.error(f"Failed to configure logger '{name}': {e}")
-        raise
\ No newline at end of file
+    # Получение или создание логгера с указанным именем
+    logger = logging.getLogger(name)
+    logger.setLevel(log_level)
+
+    # Проверка, есть ли уже обработчики, чтобы избежать дублирования
+    if not logger.handlers:
+        # Создание обработчика для вывода логов в консоль
+        handler = logging.StreamHandler()
+        # Настройка формата логов (общий форматтер с кэшем времени)
+        handler.setFormatter(_FORMATTER)
+        logger.addHandler(handler)
+    return logger